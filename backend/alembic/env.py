@@ -15,6 +15,10 @@ from sqlmodel import SQLModel
 from app.core.config import settings
 
 # Импортируем все модели, чтобы они зарегистрировались в SQLModel.metadata
+from app.models.jwt_token_record import JWTTokenRecord  # noqa: F401, E402
+from app.models.user import User  # noqa: F401, E402
+from app.models.workout import Workout  # noqa: F401, E402
+from app.models.workout_stats import WorkoutStats  # noqa: F401, E402
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -25,13 +29,27 @@ config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+# При запуске из приложения (init_db) логирование уже настроено — не перезаписываем его.
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
 target_metadata = SQLModel.metadata
 
+
+def include_name(name, type_, _parent_names) -> bool:
+    """
+    Исключить из autogenerate объекты полнотекстового поиска (миграция 0011): они
+    создаются вручную и не описаны в моделях.
+    """
+    if type_ == "table":
+        # FTS5-таблица SQLite и ее служебные таблицы (_data, _idx, _content, ...)
+        return not name.startswith("workout_fts")
+    # Вычисляемый tsvector и его GIN-индекс в PostgreSQL
+    return name not in ("search_vector", "ix_workout_search_vector")
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -56,6 +74,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -82,6 +101,7 @@ def run_migrations_online() -> None:
             target_metadata=target_metadata,
             compare_type=True,
             compare_server_default=True,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,63 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Схема БД в том виде, в котором её создавал init_db() до появления миграций.
+    # Для существующей БД выполните `alembic stamp 0001`, затем `alembic upgrade head`.
+    op.create_table('user',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('password', sa.String(), nullable=False),
+    sa.Column('role', sa.Enum('admin', 'user', name='userrole', native_enum=False), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('jwt_token_record',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('token_type', sa.String(length=20), nullable=False),
+    sa.Column('token_hash', sa.String(length=256), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('revoked', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_jwt_token_record_token_hash'), 'jwt_token_record', ['token_hash'], unique=True)
+    op.create_index(op.f('ix_jwt_token_record_token_type'), 'jwt_token_record', ['token_type'], unique=False)
+    op.create_table('workout',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('duration', sa.Integer(), nullable=False),
+    sa.Column('repetitions', sa.Integer(), nullable=False),
+    sa.Column('planned_date', sa.Date(), nullable=True),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.Column('exercises', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('workout')
+    op.drop_index(op.f('ix_jwt_token_record_token_type'), table_name='jwt_token_record')
+    op.drop_index(op.f('ix_jwt_token_record_token_hash'), table_name='jwt_token_record')
+    op.drop_table('jwt_token_record')
+    op.drop_table('user')
@@ -0,0 +1,30 @@
+"""jwt_token_record indexes for lookup and cleanup
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:55:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Поиск токена по хешу и типу
+    op.create_index('ix_jwt_token_record_token_hash_token_type', 'jwt_token_record', ['token_hash', 'token_type'], unique=False)
+    # Очистка истекших токенов фоновой задачей
+    op.create_index(op.f('ix_jwt_token_record_expires_at'), 'jwt_token_record', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_jwt_token_record_expires_at'), table_name='jwt_token_record')
+    op.drop_index('ix_jwt_token_record_token_hash_token_type', table_name='jwt_token_record')
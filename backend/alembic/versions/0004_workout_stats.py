@@ -0,0 +1,46 @@
+"""workout_stats aggregates
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('workout_stats',
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('key', sa.String(length=32), nullable=False),
+    sa.Column('workouts_count', sa.Integer(), nullable=False),
+    sa.Column('total_duration', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'key')
+    )
+    # Заполняем агрегаты по уже существующим тренировкам
+    op.execute(
+        "INSERT INTO workout_stats (kind, key, workouts_count, total_duration) "
+        "SELECT 'total', '', COUNT(*), SUM(duration) FROM workout HAVING COUNT(*) > 0"
+    )
+    op.execute(
+        "INSERT INTO workout_stats (kind, key, workouts_count, total_duration) "
+        "SELECT 'type', type, COUNT(*), SUM(duration) FROM workout GROUP BY type"
+    )
+    op.execute(
+        "INSERT INTO workout_stats (kind, key, workouts_count, total_duration) "
+        "SELECT 'date', CAST(planned_date AS VARCHAR(32)), COUNT(*), SUM(duration) "
+        "FROM workout WHERE planned_date IS NOT NULL GROUP BY planned_date"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('workout_stats')
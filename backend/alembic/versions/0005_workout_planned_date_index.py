@@ -0,0 +1,27 @@
+"""workout planned_date index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 10:35:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Выборка диапазона дат для GET /stats/timeseries
+    op.create_index(op.f('ix_workout_planned_date'), 'workout', ['planned_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_workout_planned_date'), table_name='workout')
@@ -0,0 +1,27 @@
+"""workout (user_id, id) index for keyset pagination
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 11:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Список тренировок пользователя, отсортированный по id (keyset-пагинация GET /workouts)
+    op.create_index('ix_workout_user_id_id', 'workout', ['user_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_workout_user_id_id', table_name='workout')
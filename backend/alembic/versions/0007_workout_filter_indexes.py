@@ -0,0 +1,31 @@
+"""workout composite indexes for list filters
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Фильтры GET /workouts: всегда user_id плюс диапазон дат, тип или длительность
+    op.create_index('ix_workout_user_id_planned_date_id', 'workout', ['user_id', 'planned_date', 'id'], unique=False)
+    op.create_index('ix_workout_user_id_type_planned_date', 'workout', ['user_id', 'type', 'planned_date'], unique=False)
+    op.create_index('ix_workout_user_id_duration', 'workout', ['user_id', 'duration'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_workout_user_id_duration', table_name='workout')
+    op.drop_index('ix_workout_user_id_type_planned_date', table_name='workout')
+    op.drop_index('ix_workout_user_id_planned_date_id', table_name='workout')
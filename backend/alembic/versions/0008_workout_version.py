@@ -0,0 +1,28 @@
+"""workout version for optimistic concurrency
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 12:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Версия строки для ETag/If-Match (PATCH /workouts/{id})
+    op.add_column('workout', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('workout') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,37 @@
+"""workout updated_at, deleted_at tombstones and change_seq
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 14:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Метки изменения и надгробия удаленных тренировок для синхронизации (GET /workouts/changes).
+    # Существующие тренировки получают change_seq = 0 и попадают в первую синхронизацию
+    op.add_column('workout', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('workout', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.add_column('workout', sa.Column('change_seq', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_workout_user_id_change_seq_id', 'workout', ['user_id', 'change_seq', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    # Надгробия удаляются: без deleted_at они стали бы снова видимыми тренировками
+    op.execute('DELETE FROM workout WHERE deleted_at IS NOT NULL')
+    op.drop_index('ix_workout_user_id_change_seq_id', table_name='workout')
+    with op.batch_alter_table('workout') as batch_op:
+        batch_op.drop_column('change_seq')
+        batch_op.drop_column('deleted_at')
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,75 @@
+"""workout full-text search over notes and exercises
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 15:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Полнотекстовый поиск по заметкам и упражнениям (GET /workouts/search)
+    if op.get_context().dialect.name == 'postgresql':
+        # Вычисляемый tsvector с GIN-индексом; конфигурация simple — без стемминга,
+        # заметки бывают на разных языках
+        op.execute(
+            "ALTER TABLE workout ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "to_tsvector('simple', coalesce(notes, '') || ' ' || coalesce(exercises::text, ''))"
+            ") STORED"
+        )
+        op.create_index('ix_workout_search_vector', 'workout', ['search_vector'], unique=False, postgresql_using='gin')
+        return
+
+    # SQLite: FTS5-таблица с rowid = workout.id. Колонка user_key ('u' || user_id) —
+    # токен владельца, по которому поиск ограничивается тренировками пользователя.
+    # Удаленные тренировки (deleted_at) в индекс не попадают
+    op.execute(
+        "CREATE VIRTUAL TABLE workout_fts USING fts5("
+        "user_key, notes, exercises, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER workout_fts_insert AFTER INSERT ON workout "
+        "WHEN NEW.deleted_at IS NULL BEGIN "
+        "INSERT INTO workout_fts (rowid, user_key, notes, exercises) "
+        "VALUES (NEW.id, 'u' || NEW.user_id, NEW.notes, NEW.exercises); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER workout_fts_update AFTER UPDATE OF user_id, notes, exercises, deleted_at "
+        "ON workout BEGIN "
+        "DELETE FROM workout_fts WHERE rowid = OLD.id; "
+        "INSERT INTO workout_fts (rowid, user_key, notes, exercises) "
+        "SELECT NEW.id, 'u' || NEW.user_id, NEW.notes, NEW.exercises WHERE NEW.deleted_at IS NULL; "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER workout_fts_delete AFTER DELETE ON workout BEGIN "
+        "DELETE FROM workout_fts WHERE rowid = OLD.id; "
+        "END"
+    )
+    op.execute(
+        "INSERT INTO workout_fts (rowid, user_key, notes, exercises) "
+        "SELECT id, 'u' || user_id, notes, exercises FROM workout WHERE deleted_at IS NULL"
+    )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == 'postgresql':
+        op.drop_index('ix_workout_search_vector', table_name='workout')
+        op.drop_column('workout', 'search_vector')
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS workout_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS workout_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS workout_fts_insert")
+    op.execute("DROP TABLE IF EXISTS workout_fts")
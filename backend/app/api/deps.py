@@ -1,13 +1,17 @@
 from fastapi import Depends, HTTPException, Request, status
 
-from app.models.user import User, UserRole
-from app.security.get_user_id_by_token import get_user_id_by_token
+from app.models.user import Principal, User, UserRole
+from app.security.get_user_id_by_token import get_principal_by_token
 from app.services.jwt_tokens_service import jwt_tokens_service
 from app.services.user_service import user_service
 
 
-async def get_current_user_from_cookie(request: Request):
-    """Получение текущего пользователя по JWT-токену из куки"""
+async def get_current_principal_from_cookie(request: Request) -> Principal:
+    """
+    Получение текущего пользователя (ID, роль, поколение токенов) по JWT-токену из куки.
+
+    Данные берутся из подписанных claims токена, запись User из БД не загружается.
+    """
     token = request.cookies.get("access_token")
 
     if not token:
@@ -16,14 +20,36 @@ async def get_current_user_from_cookie(request: Request):
             detail="Токен не найден в куки. Необходима авторизация.",
         )
 
-    # Проверяем не истёк ли Access токен и не инвалидирован ли он
-    if jwt_tokens_service.check_access_token_expired(token):
+    # Токен уже проверялся недавно — обходимся без обращений к БД/Redis
+    cached = jwt_tokens_service.get_cached_access_token(token)
+    if cached:
+        principal = cached.principal
+    else:
+        # Проверяем не истёк ли Access токен и не инвалидирован ли он
+        access_token = await jwt_tokens_service.get_valid_access_token(token)
+        if not access_token:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Access токен истёк или инвалидирован",
+            )
+        principal = get_principal_by_token(token)
+        jwt_tokens_service.cache_access_token(token, principal, access_token.expires_at)
+
+    # Токены старого поколения отозваны "выходом со всех устройств" (сверка по кэшу)
+    if not await jwt_tokens_service.check_token_generation(
+        principal.id, principal.token_generation
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Access токен истёк или инвалидирован"
         )
+    return principal
+
 
-    user_id = get_user_id_by_token(token)
-    user = user_service.get_user_by_id(user_id)
+async def get_current_user_from_cookie(
+    principal: Principal = Depends(get_current_principal_from_cookie),
+) -> User:
+    """Получение полной записи текущего пользователя из БД (для роутов, которым она нужна)"""
+    user = await user_service.get_user_by_id(principal.id)
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден")
@@ -31,18 +57,22 @@ async def get_current_user_from_cookie(request: Request):
     return user
 
 
-def require_role(user: User) -> bool:
+def require_role(user: User | Principal) -> bool:
     """Проверяет, является ли пользователь админом. Возвращает False, если не админ."""
     return user.role == UserRole.ADMIN
 
 
 async def get_current_admin_user_from_cookie(
-    current_user: User = Depends(get_current_user_from_cookie),
-):
+    principal: Principal = Depends(get_current_principal_from_cookie),
+) -> Principal:
     """Получение текущего пользователя с проверкой прав администратора из куки"""
-    if not require_role(current_user):
+    # Токены без claim role (выпущены до его появления) — роль берем из БД
+    user = (
+        principal if principal.role is not None else await user_service.get_user_by_id(principal.id)
+    )
+    if not user or not require_role(user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Недостаточно прав доступа. Требуется роль администратора.",
         )
-    return current_user
+    return principal
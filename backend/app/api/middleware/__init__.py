@@ -1,3 +1,4 @@
+from app.api.middleware.db_session_middleware import db_session_middleware
 from app.api.middleware.logging_middleware import logging_middleware
 
-__all__ = ["logging_middleware"]
+__all__ = ["db_session_middleware", "logging_middleware"]
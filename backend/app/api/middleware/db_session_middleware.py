@@ -0,0 +1,20 @@
+from fastapi import Request
+
+from app.core.database import request_db_session
+
+
+async def db_session_middleware(request: Request, call_next):
+    """
+    Middleware для единой сессии БД на HTTP-запрос (unit of work).
+
+    Все репозитории, вызванные при обработке запроса (включая зависимости вроде
+    get_current_user_from_cookie), работают в одной сессии и одной транзакции.
+    Commit выполняется один раз перед отправкой ответа, rollback — при необработанной
+    ошибке и при ответе с ошибкой (4xx/5xx): HTTPException превращается в ответ раньше,
+    чем доходит до middleware, и без этого частичные изменения до него коммитились бы.
+    """
+    async with request_db_session() as db:
+        response = await call_next(request)
+        if response.status_code >= 400:
+            await db.rollback()
+        return response
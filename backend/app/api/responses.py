@@ -0,0 +1,36 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse as FastAPIORJSONResponse
+from pydantic import BaseModel
+
+
+def _orjson_default(obj: Any) -> Any:
+    """
+    Сериализовать то, что orjson не умеет сам: pydantic/SQLModel модели.
+
+    Модель превращается в словарь сериализатором pydantic-core напрямую, в обход
+    model_dump (у SQLModel он заметно дороже); даты и datetime orjson пишет сам.
+    """
+    if isinstance(obj, BaseModel):
+        return obj.__pydantic_serializer__.to_python(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(FastAPIORJSONResponse):
+    """
+    ORJSONResponse из FastAPI с хуком default для pydantic/SQLModel моделей.
+
+    Класс ответа по умолчанию для api_router. Эндпоинты списков возвращают его
+    напрямую со строками из репозитория (dataclass WorkoutRow, которые orjson пишет
+    сам), и FastAPI не проверяет их повторно по response_model. Стандартный класс
+    вызывает orjson.dumps без default, поэтому модель в содержимом ответа (например,
+    ORM-объект Workout, возвращенный напрямую) падала бы с TypeError.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
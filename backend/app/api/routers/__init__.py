@@ -1,9 +1,12 @@
 from fastapi import APIRouter
 
-from app.api.routers import auth, stats, workouts
+from app.api.responses import ORJSONResponse
+from app.api.routers import auth, monitoring, stats, workouts
 
-api_router = APIRouter()
+# Все ответы API сериализуются orjson
+api_router = APIRouter(default_response_class=ORJSONResponse)
 
 api_router.include_router(workouts.router, prefix="/workouts", tags=["workouts"])
 api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+api_router.include_router(monitoring.router, prefix="/monitoring", tags=["monitoring"])
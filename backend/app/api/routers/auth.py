@@ -2,16 +2,16 @@ import logging
 
 from fastapi import (  # Depends - механизм Dependency Injection для переиспользования логики
     APIRouter,
+    Depends,
     Request,
     Response,
 )
 from pydantic import BaseModel
 
+from app.api.deps import get_current_principal_from_cookie
 from app.core.config import settings
-from app.models.user import User
+from app.models.user import Principal, User
 from app.security.cookie_utils import delete_cookie, get_cookie, set_cookie
-from app.security.create_jwt_token import create_jwt_token
-from app.security.get_user_id_by_token import get_user_id_by_token
 from app.services.auth_service import auth_service
 from app.services.jwt_tokens_service import jwt_tokens_service
 
@@ -29,7 +29,7 @@ class LoginRequest(BaseModel):
 @router.post("/register")
 async def register(user_data: User):
     """Регистрация нового пользователя"""
-    result = auth_service.register(user_data)
+    result = await auth_service.register(user_data)
     logger.info("Регистрация успешна: username=%s", user_data.username)
     return result
 
@@ -64,12 +64,12 @@ async def logout(request: Request, response: Response):
     # Инвалидируем Refresh токен
     refresh_token = await get_cookie(request, "refresh_token")
     if refresh_token:
-        jwt_tokens_service.invalidate_refresh_token(refresh_token)
+        await jwt_tokens_service.invalidate_refresh_token(refresh_token)
 
     # Инвалидируем Access токен
     access_token = await get_cookie(request, "access_token")
     if access_token:
-        jwt_tokens_service.invalidate_access_token(access_token)
+        await jwt_tokens_service.invalidate_access_token(access_token)
 
     # Удаляем токены из куки
     delete_cookie(response, "access_token")
@@ -79,6 +79,22 @@ async def logout(request: Request, response: Response):
     return {"message": "Успешный выход из системы"}
 
 
+@router.post("/logout-all")
+async def logout_all(
+    response: Response, current_user: Principal = Depends(get_current_principal_from_cookie)
+):
+    """Выход со всех устройств (отзыв всех токенов пользователя)"""
+    # Одна запись: токены прежнего поколения перестают приниматься на всех устройствах
+    await jwt_tokens_service.revoke_all_user_tokens(current_user.id)
+    logger.info("Выход со всех устройств: user_id=%s", current_user.id)
+
+    # Удаляем токены из куки
+    delete_cookie(response, "access_token")
+    delete_cookie(response, "refresh_token")
+
+    return {"message": "Успешный выход со всех устройств"}
+
+
 @router.post("/refresh")
 async def refresh_token(request: Request, response: Response):
     """Обновление Access токена"""
@@ -87,29 +103,14 @@ async def refresh_token(request: Request, response: Response):
     if not refresh_token:
         return {"message": "Refresh токен не найден в cookies"}
 
-    # Проверяем не истёк ли Refresh токен
-    if jwt_tokens_service.check_refresh_token_expired(refresh_token):
+    # Атомарно обмениваем Refresh токен на новую пару токенов
+    # (повторно использованный или отозванный токен не пройдет)
+    tokens = await jwt_tokens_service.rotate_refresh_token(refresh_token)
+    if not tokens:
         return {"message": "Refresh токен истёк или инвалидирован"}
 
-    # Получаем user_id из refresh токена
-    user_id = get_user_id_by_token(refresh_token)
-
-    # Получаем Access токен по Refresh токену
-    access_token = await jwt_tokens_service.get_access_token_by_refresh_token(
-        user_id, refresh_token
-    )
-
-    # Инвалидируем Refresh токен
-    jwt_tokens_service.invalidate_refresh_token(refresh_token)
-
-    # Обновляем Refresh токен
-    new_refresh_token_str = create_jwt_token(user_id, settings.REFRESH_TOKEN_EXPIRE_MINUTES)
-    jwt_tokens_service.create_refresh_token(user_id, new_refresh_token_str)
+    access_token, new_refresh_token = tokens
     set_cookie(
-        response, new_refresh_token_str, "refresh_token", settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60
+        response, new_refresh_token, "refresh_token", settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60
     )
-
-    if access_token:
-        return {"access_token": access_token, "refresh_token": new_refresh_token_str}
-    else:
-        return {"message": "Неверный Refresh токен"}
+    return {"access_token": access_token, "refresh_token": new_refresh_token}
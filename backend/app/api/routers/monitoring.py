@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_admin_user_from_cookie
+from app.services.monitoring_service import monitoring_service
+
+router = APIRouter(dependencies=[Depends(get_current_admin_user_from_cookie)])
+
+
+@router.get("/pools")
+async def get_pools_stats():
+    """Получить статистику пулов соединений (Redis, БД) и кэша Access токенов"""
+    return monitoring_service.get_pools_stats()
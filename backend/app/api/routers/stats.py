@@ -1,9 +1,11 @@
 from datetime import date
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response
 
 from app.api.deps import get_current_admin_user_from_cookie
+from app.api.responses import ORJSONResponse
 from app.models.workout import GymType
+from app.models.workout_stats import StatsTimeseriesPoint, TimeseriesBucket
 from app.services.stats_service import stats_service
 
 router = APIRouter(dependencies=[Depends(get_current_admin_user_from_cookie)])
@@ -16,23 +18,36 @@ async def get_stats(
 ):
     """Получить статистику по тренировкам"""
     # Получаем статистику
-    global_trains_amount = stats_service.get_global_trains_amount()
-    global_trains_duration = stats_service.get_global_trains_duration()
-    global_trains_by_type = stats_service.get_global_trains_by_type(type)
-    global_trains_by_date = stats_service.get_global_trains_by_date(date)
+    stats = await stats_service.get_stats(type, date)
 
     # Формируем результат
     result = {
-        "global_trains_amount": global_trains_amount,
-        "global_trains_duration": global_trains_duration,
+        "global_trains_amount": stats.trains_amount,
+        "global_trains_duration": stats.trains_duration,
     }
 
     # Добавляем статистику по типу, если она есть
     if type:
-        result["global_trains_by_type"] = global_trains_by_type
+        result["global_trains_by_type"] = stats.trains_by_type
 
     # Добавляем статистику по дате, если она есть
     if date:
-        result["global_trains_by_date"] = global_trains_by_date
+        result["global_trains_by_date"] = stats.trains_by_date
 
     return result
+
+
+@router.get("/timeseries", response_model=list[StatsTimeseriesPoint])
+async def get_stats_timeseries(
+    date_from: date,
+    date_to: date,
+    bucket: TimeseriesBucket = "day",
+    type: GymType | None = None,
+) -> Response:
+    """Получить статистику по дням, неделям или месяцам за период (для графиков)"""
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+
+    points = await stats_service.get_timeseries(date_from, date_to, bucket, type)
+    # Точки из репозитория (StatsTimeseriesRow) отдаются orjson без проверки по response_model
+    return ORJSONResponse(points)
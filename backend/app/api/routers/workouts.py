@@ -1,96 +1,304 @@
 from datetime import date
+from typing import NoReturn
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
-from app.api.deps import get_current_user_from_cookie
-from app.models.user import User
-from app.models.workout import GymType, Workout
+from app.api.deps import get_current_principal_from_cookie
+from app.api.responses import ORJSONResponse
+from app.models.user import Principal
+from app.models.workout import (
+    GymType,
+    Workout,
+    WorkoutChanges,
+    WorkoutFileFormat,
+    WorkoutImportResult,
+    WorkoutPatch,
+    WorkoutRead,
+)
+from app.services.workout_export_service import EXPORT_MEDIA_TYPES, workout_export_service
+from app.services.workout_import_service import workout_import_service
 from app.services.workout_service import workout_service
+from app.utils.etag import if_none_match_matches, make_etag, parse_if_match
 
 router = APIRouter()
 
+# Браузер может хранить ответ, но обязан перепроверять его по ETag (If-None-Match)
+CACHE_CONTROL = "private, no-cache"
 
-@router.post("", response_model=Workout, status_code=201)
+
+def not_modified(etag: str) -> Response:
+    """Ответ 304 Not Modified: у клиента актуальная версия ресурса"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+@router.post("", response_model=WorkoutRead, status_code=201)
 async def create_workout(
-    workout_data: Workout, current_user: User = Depends(get_current_user_from_cookie)
+    workout_data: Workout,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal_from_cookie),
 ) -> Workout:
     """Создать новую тренировочную сессию"""
     workout_data.user_id = current_user.id
-    return workout_service.create_workout(workout_data)
+    workout = await workout_service.create_workout(workout_data)
+    response.headers["ETag"] = make_etag(workout.version)
+    return workout
 
 
-@router.get("", response_model=list[Workout])
-async def get_workouts(
+@router.post("/import", response_model=WorkoutImportResult)
+async def import_workouts(
+    request: Request,
+    format: WorkoutFileFormat | None = None,
+    current_user: Principal = Depends(get_current_principal_from_cookie),
+) -> WorkoutImportResult:
+    """
+    Импортировать тренировки из тела запроса в формате NDJSON или CSV.
+
+    Формат берется из параметра format, иначе из Content-Type (text/csv → CSV,
+    остальное → NDJSON). Тело читается потоком; в ответе — число принятых и отклоненных
+    строк и номера строк с ошибками.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if content_type.startswith("text/csv") else "ndjson"
+    try:
+        return await workout_import_service.import_workouts(
+            current_user.id, request.stream(), format
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/export")
+async def export_workouts(
+    format: WorkoutFileFormat = "ndjson",
     type: GymType | None = None,
     date_from: date | None = None,
     date_to: date | None = None,
     min_duration: int | None = None,
     max_duration: int | None = None,
-    page: int = 1,
-    size: int = 10,
-    current_user: User = Depends(get_current_user_from_cookie),
-) -> list[Workout]:
-    """Получить список тренировок с поддержкой фильтрации"""
-    return workout_service.get_workouts(
+    current_user: Principal = Depends(get_current_principal_from_cookie),
+) -> StreamingResponse:
+    """
+    Выгрузить все тренировки пользователя (с фильтрами, как у списка) в NDJSON или CSV.
+
+    Ответ отдается потоком: строки читаются из БД пачками и сразу отправляются клиенту,
+    поэтому память не зависит от объема истории. CSV можно загрузить обратно через импорт.
+    """
+    chunks = workout_export_service.export_workouts(
         user_id=current_user.id,
+        format=format,
         type=type,
         date_from=date_from,
         date_to=date_to,
         min_duration=min_duration,
         max_duration=max_duration,
-        page=page,
-        size=size,
     )
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="workouts.{format}"'},
+    )
+
+
+@router.get("/search", response_model=list[WorkoutRead])
+async def search_workouts(
+    q: str = Query(min_length=1, max_length=200),
+    size: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    current_user: Principal = Depends(get_current_principal_from_cookie),
+) -> Response:
+    """
+    Найти тренировки по словам в заметках и упражнениях (например, q=deadlift).
+
+    Слова ищутся по префиксу без учета регистра, результаты отсортированы по
+    релевантности. Если есть следующая страница, ее курсор возвращается в заголовке
+    X-Next-Cursor; передайте его в параметре cursor вместе с тем же q.
+    """
+    try:
+        workouts, next_cursor = await workout_service.search_workouts(
+            current_user.id, q, size, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor is not None else None
+    # Строки из репозитория (WorkoutRow) отдаются orjson без проверки по response_model
+    return ORJSONResponse(workouts, headers=headers)
+
+
+@router.get("/changes", response_model=WorkoutChanges)
+async def get_workout_changes(
+    since: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: Principal = Depends(get_current_principal_from_cookie),
+) -> Response:
+    """
+    Получить тренировки, созданные, измененные или удаленные после курсора since.
+
+    Для офлайн-клиентов: первый запрос без since возвращает текущие тренировки, дальше
+    клиент передает next_cursor из предыдущего ответа и получает только изменения с тех
+    пор. Удаленные тренировки приходят надгробиями с заполненным deleted_at. Пока
+    has_more=true, изменения нужно дочитать следующими запросами.
+    """
+    try:
+        changes, next_cursor, has_more = await workout_service.get_workout_changes(
+            current_user.id, since, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    # Строки из репозитория (WorkoutRow) отдаются orjson без проверки по response_model
+    return ORJSONResponse({"changes": changes, "next_cursor": next_cursor, "has_more": has_more})
+
+
+@router.get("", response_model=list[WorkoutRead])
+async def get_workouts(
+    type: GymType | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    min_duration: int | None = None,
+    max_duration: int | None = None,
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1),
+    cursor: str | None = None,
+    if_none_match: str | None = Header(default=None),
+    current_user: Principal = Depends(get_current_principal_from_cookie),
+) -> Response:
+    """
+    Получить список тренировок с поддержкой фильтрации.
 
+    Тренировки отсортированы по id. Если есть следующая страница, ее курсор возвращается
+    в заголовке X-Next-Cursor; передайте его в параметре cursor, чтобы получить
+    продолжение списка. page/size без cursor работают как раньше (через offset).
 
-@router.get("/{workout_id}", response_model=Workout)
+    ETag — счетчик изменений тренировок пользователя: если он совпал с If-None-Match,
+    ответ 304 отдается после одного чтения по первичному ключу, без выборки тренировок.
+    """
+    # Счетчик читается до списка: если тренировки изменятся между запросами, ETag
+    # окажется старее данных и следующий запрос просто получит их заново
+    etag = make_etag(await workout_service.get_workouts_version(current_user.id))
+    if if_none_match_matches(if_none_match, etag):
+        return not_modified(etag)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    try:
+        workouts, next_cursor = await workout_service.get_workouts(
+            user_id=current_user.id,
+            type=type,
+            date_from=date_from,
+            date_to=date_to,
+            min_duration=min_duration,
+            max_duration=max_duration,
+            page=page,
+            size=size,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = next_cursor
+    # Строки из репозитория (WorkoutRow) отдаются orjson без проверки по response_model
+    return ORJSONResponse(workouts, headers=headers)
+
+
+@router.get("/{workout_id}", response_model=WorkoutRead)
 async def get_workout(
-    workout_id: int, current_user: User = Depends(get_current_user_from_cookie)
-) -> Workout:
-    """Получить конкретную тренировку по ID"""
-    workout = workout_service.get_workout_by_id(workout_id)
+    workout_id: int,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    current_user: Principal = Depends(get_current_principal_from_cookie),
+) -> Workout | Response:
+    """
+    Получить конкретную тренировку по ID.
+
+    ETag — версия тренировки (ее же ждет If-Match при изменении). Если она совпала с
+    If-None-Match, ответ 304 отдается по чтению владельца и версии, без загрузки строки.
+    """
+    if if_none_match is not None:
+        owner_and_version = await workout_service.get_workout_owner_and_version(workout_id)
+        if owner_and_version is not None:
+            owner_id, version = owner_and_version
+            etag = make_etag(version)
+            if owner_id == current_user.id and if_none_match_matches(if_none_match, etag):
+                return not_modified(etag)
+
+    workout = await workout_service.get_workout_by_id(workout_id)
 
     if not workout:
         raise HTTPException(status_code=404, detail="Workout not found")
     if workout.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
+    response.headers["ETag"] = make_etag(workout.version)
+    response.headers["Cache-Control"] = CACHE_CONTROL
     return workout
 
 
-@router.put("/{workout_id}", response_model=Workout)
+@router.put("/{workout_id}", response_model=WorkoutRead)
 async def update_workout(
     workout_id: int,
     workout_data: Workout,
-    current_user: User = Depends(get_current_user_from_cookie),
+    response: Response,
+    if_match: str | None = Header(default=None),
+    current_user: Principal = Depends(get_current_principal_from_cookie),
 ) -> Workout:
-    """Обновить тренировку"""
-    existing_workout = workout_service.get_workout_by_id(workout_id)
-    if not existing_workout:
-        raise HTTPException(status_code=404, detail="Workout not found")
-    if existing_workout.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Forbidden")
+    """Обновить тренировку целиком (с If-Match — только если версия не изменилась)"""
+    workout = await workout_service.update_workout(
+        workout_id, current_user.id, workout_data, parse_if_match(if_match)
+    )
+    if not workout:
+        await raise_workout_write_error(workout_id, current_user.id)
+    response.headers["ETag"] = make_etag(workout.version)
+    return workout
 
-    workout = workout_service.update_workout(workout_id, workout_data)
 
-    if not workout:
-        raise HTTPException(status_code=404, detail="Workout not found")
+@router.patch("/{workout_id}", response_model=WorkoutRead)
+async def patch_workout(
+    workout_id: int,
+    patch: WorkoutPatch,
+    response: Response,
+    if_match: str | None = Header(default=None),
+    current_user: Principal = Depends(get_current_principal_from_cookie),
+) -> Workout:
+    """
+    Обновить только переданные поля тренировки.
 
+    С заголовком If-Match (ETag из предыдущего ответа) изменение применяется, только
+    если тренировку с тех пор никто не менял, иначе 412 Precondition Failed. Проверка
+    версии выполняется в самом UPDATE, без предварительного чтения.
+    """
+    if not patch.model_fields_set:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    workout = await workout_service.patch_workout(
+        workout_id, current_user.id, patch, parse_if_match(if_match)
+    )
+    if not workout:
+        await raise_workout_write_error(workout_id, current_user.id)
+    response.headers["ETag"] = make_etag(workout.version)
     return workout
 
 
 @router.delete("/{workout_id}", status_code=204)
 async def delete_workout(
-    workout_id: int, current_user: User = Depends(get_current_user_from_cookie)
+    workout_id: int, current_user: Principal = Depends(get_current_principal_from_cookie)
 ) -> None:
-    """Удалить тренировку"""
-    existing_workout = workout_service.get_workout_by_id(workout_id)
-    if not existing_workout:
-        raise HTTPException(status_code=404, detail="Workout not found")
-    if existing_workout.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Forbidden")
+    """Удалить тренировку (остается надгробием для GET /workouts/changes)"""
+    success = await workout_service.delete_workout(workout_id, current_user.id)
+    if not success:
+        await raise_workout_write_error(workout_id, current_user.id)
 
-    success = workout_service.delete_workout(workout_id)
 
-    if not success:
+async def raise_workout_write_error(workout_id: int, user_id: int) -> NoReturn:
+    """
+    Ответить 404, 403 или 412 после того, как запись с условием на владельца (и версию)
+    не затронула строк.
+
+    Успешная запись проверяет владельца и версию в самом UPDATE/DELETE; этот
+    дополнительный запрос выполняется только при неудаче.
+    """
+    owner_id = await workout_service.get_workout_owner_id(workout_id)
+    if owner_id is None:
         raise HTTPException(status_code=404, detail="Workout not found")
+    if owner_id != user_id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    raise HTTPException(status_code=412, detail="Workout has been modified")
@@ -0,0 +1,52 @@
+"""
+Пересчет агрегатов статистики тренировок (таблица workout_stats) по таблице workout.
+
+Агрегаты обновляются инкрементально при каждом изменении тренировок; команда нужна
+для проверки их согласованности и восстановления (например, после ручных правок в БД).
+
+Запуск (из директории backend/):
+    uv run python -m app.commands.rebuild_workout_stats          # пересчитать
+    uv run python -m app.commands.rebuild_workout_stats --check  # только проверить
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.core.database import close_async_engine
+from app.services.stats_service import stats_service
+
+
+async def rebuild_workout_stats(apply: bool) -> int:
+    """Пересчитать агрегаты и вывести расхождения. Возвращает число расхождений."""
+    try:
+        mismatches = await stats_service.rebuild_stats(apply)
+    finally:
+        await close_async_engine()
+
+    for (kind, key), (stored, actual) in sorted(mismatches.items()):
+        print(f"{kind}:{key or '-'}  сохранено (count, duration)={stored}  реально={actual}")
+
+    if not mismatches:
+        print("Агрегаты статистики согласованы с таблицей workout")
+    elif apply:
+        print(f"Агрегаты статистики пересчитаны, исправлено расхождений: {len(mismatches)}")
+    else:
+        print(f"Найдено расхождений: {len(mismatches)}")
+    return len(mismatches)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--check", action="store_true", help="только проверить, ничего не изменяя в БД"
+    )
+    args = parser.parse_args()
+
+    mismatches = asyncio.run(rebuild_workout_stats(apply=not args.check))
+    # В режиме проверки расхождения — ошибка (удобно для CI и cron)
+    sys.exit(1 if args.check and mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,6 +12,9 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    # Применять миграции при старте (под межпроцессной блокировкой). false — миграции
+    # применяются отдельным шагом деплоя (alembic upgrade head), при старте только проверка
+    MIGRATE_ON_STARTUP: bool = True
 
     # Security
     SECRET_KEY: str
@@ -17,6 +22,50 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_MINUTES: int
 
+    # In-process кэш проверенных Access токенов (0 — кэш отключен).
+    # Logout сбрасывает запись сразу, но только в своём воркере: в остальных токен
+    # остаётся валидным не дольше TTL
+    ACCESS_TOKEN_CACHE_SIZE: int = 10000
+    ACCESS_TOKEN_CACHE_TTL_SECONDS: int = 30
+    # Сколько секунд поколение токенов пользователя кэшируется в памяти процесса:
+    # с такой задержкой "выход со всех устройств" доходит до остальных воркеров
+    TOKEN_GENERATION_CACHE_TTL_SECONDS: int = 5
+
+    # Stateless Access токены: не сохраняются в Redis/БД, проверяются по подписи и exp.
+    # Отозванные при logout токены попадают в денайлист, который синхронизируется
+    # между воркерами раз в ACCESS_TOKEN_DENYLIST_SYNC_SECONDS
+    ACCESS_TOKEN_STATELESS: bool = False
+    ACCESS_TOKEN_DENYLIST_SYNC_SECONDS: int = 10
+
+    # Фоновая очистка истекших/отозванных токенов в БД (при REDIS_ENABLED=false):
+    # раз в JWT_TOKENS_SWEEP_INTERVAL_SECONDS, пачками по JWT_TOKENS_SWEEP_BATCH_SIZE записей
+    JWT_TOKENS_SWEEP_INTERVAL_SECONDS: int = 300
+    JWT_TOKENS_SWEEP_BATCH_SIZE: int = 500
+
+    # Хеширование и проверка паролей (bcrypt) вне event loop: пул "thread" или "process"
+    # из PASSWORD_HASH_WORKERS воркеров. Если в работе и в очереди уже
+    # PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE операций, запрос сразу получает 503
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+
+    # Кэш GET /stats по ключу (type, date): значение свежее STATS_CACHE_TTL_SECONDS
+    # (0 — без кэша), затем еще STATS_CACHE_STALE_SECONDS отдается устаревшим, пока
+    # в фоне идет пересчет. STATS_CACHE_REDIS — общий кэш воркеров в Redis
+    STATS_CACHE_TTL_SECONDS: float = 5
+    STATS_CACHE_STALE_SECONDS: float = 60
+    STATS_CACHE_SIZE: int = 1000
+    STATS_CACHE_REDIS: bool = False
+
+    # Импорт тренировок (POST /workouts/import): строки вставляются пачками по
+    # WORKOUT_IMPORT_BATCH_SIZE с коммитом после каждой; в ответе не больше
+    # WORKOUT_IMPORT_MAX_ERRORS описаний отклоненных строк
+    WORKOUT_IMPORT_BATCH_SIZE: int = 1000
+    WORKOUT_IMPORT_MAX_ERRORS: int = 100
+    # Экспорт тренировок (GET /workouts/export): строки читаются из БД и отправляются
+    # клиенту пачками по WORKOUT_EXPORT_BATCH_SIZE
+    WORKOUT_EXPORT_BATCH_SIZE: int = 1000
+
     # Admin credentials for auto-role assignment
     ADMIN_USERNAME: str
     ADMIN_PASSWORD: str
@@ -28,6 +77,9 @@ class Settings(BaseSettings):
     REDIS_USERNAME: str = "default"
     REDIS_PASSWORD: str = ""
     REDIS_DB: int = 0
+    # Размер пула соединений на воркер и максимальное ожидание свободного соединения
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT_SECONDS: float = 2.0
 
     # Logging
     LOG_LEVEL: str  # DEBUG, INFO, WARNING, ERROR, CRITICAL
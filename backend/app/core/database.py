@@ -1,11 +1,19 @@
-from collections.abc import Generator
-from contextlib import contextmanager
+import os
+from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
 
-from sqlalchemy import create_engine
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker
-from sqlmodel import SQLModel
 
+from alembic import command
 from app.core.config import settings
 
 # Импортируем модели, чтобы они зарегистрировались в SQLModel.metadata
@@ -16,9 +24,13 @@ from app.models.workout import Workout  # noqa: F401
 # Создание engine для подключения к БД
 engine = create_engine(
     settings.DATABASE_URL,  # URL подключения к базе данных
-    connect_args={
-        "check_same_thread": False
-    },  # Для SQLite: разрешает использование одного соединения в разных потоках
+    # Только для SQLite: разрешает использование одного соединения в разных потоках
+    # (драйверы PostgreSQL такой аргумент не принимают)
+    connect_args=(
+        {"check_same_thread": False}
+        if make_url(settings.DATABASE_URL).get_backend_name() == "sqlite"
+        else {}
+    ),
     echo=False,  # Установить True для отладки SQL-запросов (логирование всех SQL-запросов)
 )
 
@@ -29,6 +41,39 @@ SessionLocal = sessionmaker(
     bind=engine,  # Привязка к engine для создания сессий
 )
 
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Преобразовать DATABASE_URL в URL с асинхронным драйвером.
+
+    sqlite:// → sqlite+aiosqlite://, postgresql:// → postgresql+asyncpg://.
+    URL, в котором драйвер уже указан явно, возвращается без изменений.
+    """
+    url = make_url(database_url)
+    if url.drivername == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    elif url.drivername in ("postgresql", "postgresql+psycopg2"):
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+# Создание асинхронного engine: запросы из async-роутеров не блокируют event loop
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    echo=False,
+)
+
+# Фабрика асинхронных сессий
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,  # Объекты остаются доступными после commit (без ленивых загрузок)
+)
+
+# Сессия текущего HTTP-запроса (unit of work). Устанавливается в request_db_session()
+_request_session: ContextVar[AsyncSession | None] = ContextVar("request_session", default=None)
+
 # Базовый класс для ORM моделей
 Base = declarative_base()
 
@@ -72,9 +117,183 @@ def get_db_session():
         db.close()
 
 
+@asynccontextmanager
+async def request_db_session() -> AsyncGenerator[AsyncSession]:
+    """
+    Открыть одну сессию и транзакцию БД на весь HTTP-запрос (unit of work).
+
+    Пока контекст активен, get_async_db_session() и репозитории присоединяются к этой
+    сессии вместо открытия собственных. Коммит выполняется один раз при выходе из
+    контекста, откат — если наружу вылетело исключение. Соединение из пула берётся
+    лениво, при первом обращении к БД.
+
+    Использование:
+        async with request_db_session():
+            await workout_repository.get_by_id(workout_id)
+            await workout_repository.update(workout_id, workout_data)
+            # один commit на оба вызова
+    """
+    async with AsyncSessionLocal() as db:
+        token = _request_session.set(db)
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        finally:
+            _request_session.reset(token)
+
+
+@asynccontextmanager
+async def get_async_db_session() -> AsyncGenerator[AsyncSession]:
+    """
+    Асинхронный контекстный менеджер для получения сессии БД.
+    Автоматически коммитит изменения при успешном выполнении или откатывает при ошибке.
+
+    Внутри request_db_session() возвращает сессию запроса: commit/rollback в этом
+    случае выполняет владелец сессии при завершении запроса.
+
+    Использование:
+        async with get_async_db_session() as db:
+            result = await db.execute(select(Item))
+            db.add(new_item)
+            # commit вызывается автоматически при выходе из контекста
+    """
+    request_session = _request_session.get()
+    if request_session is not None:
+        yield request_session
+        return
+
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+async def release_db_connection() -> None:
+    """
+    Вернуть соединение сессии текущего запроса в пул перед долгой операцией без БД
+    (например, проверкой пароля bcrypt или ожиданием следующей части тела запроса).
+
+    Текущая транзакция запроса фиксируется, следующее обращение к БД возьмет соединение
+    из пула заново. Все изменения, сделанные запросом к этому моменту, коммитятся и не
+    будут откачены, если запрос завершится ошибкой позже.
+    """
+    request_session = _request_session.get()
+    if request_session is not None and request_session.in_transaction():
+        await request_session.commit()
+
+
+def get_db_pool_stats() -> dict:
+    """Статистика пула соединений асинхронного engine для мониторинга"""
+    pool = async_engine.pool
+    if not hasattr(pool, "checkedout"):
+        # Пулы без учета соединений (NullPool, StaticPool)
+        return {"status": pool.status()}
+    return {
+        "size": pool.size(),
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+
+
+async def close_async_engine() -> None:
+    """
+    Закрыть пул соединений асинхронного engine.
+    Вызывается при завершении приложения.
+    """
+    await async_engine.dispose()
+
+
+def get_alembic_config() -> Config:
+    """Конфигурация Alembic из backend/alembic.ini (не зависит от текущей директории)"""
+    backend_dir = Path(__file__).resolve().parents[2]
+    config = Config(str(backend_dir / "alembic.ini"))
+    config.set_main_option("script_location", str(backend_dir / "alembic"))
+    # Логирование уже настроено приложением, alembic.ini не должен его перезаписывать
+    config.attributes["configure_logger"] = False
+    return config
+
+
+# Ключ advisory lock PostgreSQL, под которым воркеры применяют миграции при старте
+MIGRATION_LOCK_KEY = 4_615_011
+
+
+@contextmanager
+def migration_lock() -> Generator[None]:
+    """
+    Межпроцессная блокировка на время миграций при старте.
+
+    Воркеры uvicorn выполняют init_db() одновременно: без блокировки два процесса
+    создают alembic_version или применяют одну миграцию параллельно, и воркер падает.
+    PostgreSQL — advisory lock на отдельном соединении; SQLite — блокировка файла рядом
+    с БД (процессы с общей файловой БД работают на одной машине).
+    """
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() == "postgresql":
+        with engine.connect() as connection:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            try:
+                yield
+            finally:
+                connection.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY}
+                )
+        return
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        # БД в памяти принадлежит одному процессу
+        yield
+        return
+    with open(f"{url.database}.migrate.lock", "wb") as lock_file:
+        if os.name == "nt":
+            import msvcrt
+
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        # Блокировка снимается при закрытии файла
+        yield
+
+
+def is_db_up_to_date(config: Config) -> bool:
+    """Применены ли все миграции: текущие ревизии БД совпадают с head"""
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+    with engine.connect() as connection:
+        return set(MigrationContext.configure(connection).get_current_heads()) == heads
+
+
 def init_db() -> None:
     """
-    Инициализация базы данных: создание всех таблиц.
-    Вызывается при старте приложения.
+    Инициализация базы данных при старте приложения.
+
+    При MIGRATE_ON_STARTUP миграции Alembic применяются до последней ревизии под
+    migration_lock: первый воркер применяет их, остальные дожидаются блокировки и видят
+    актуальную БД. Иначе миграции — отдельный шаг деплоя (alembic upgrade head), а при
+    старте только проверяется, что БД на последней ревизии.
+
+    БД, созданная до появления миграций (через create_all), соответствует ревизии 0001:
+    она помечается этой ревизией, после чего применяются остальные миграции.
+
+    Raises:
+        RuntimeError: Если MIGRATE_ON_STARTUP выключен, а БД не на последней ревизии
     """
-    SQLModel.metadata.create_all(bind=engine)
+    config = get_alembic_config()
+    if not settings.MIGRATE_ON_STARTUP:
+        if not is_db_up_to_date(config):
+            raise RuntimeError("Database is not up to date: run `alembic upgrade head`")
+        return
+    with migration_lock():
+        if is_db_up_to_date(config):
+            return
+        with engine.connect() as connection:
+            tables = set(inspect(connection).get_table_names())
+        if tables and "alembic_version" not in tables:
+            command.stamp(config, "0001")
+        command.upgrade(config, "head")
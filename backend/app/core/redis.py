@@ -1,8 +1,50 @@
-from redis import Redis
+import time
+
+from redis.asyncio import BlockingConnectionPool, Redis
 
 from app.core.config import settings
 
-# Глобальный экземпляр Redis клиента
+
+class MonitoredConnectionPool(BlockingConnectionPool):
+    """
+    Пул соединений Redis фиксированного размера со статистикой использования.
+
+    При исчерпании пула запрос ждет свободное соединение (не дольше timeout),
+    а не открывает новое. Время ожидания учитывается в статистике.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    async def get_connection(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await super().get_connection(*args, **kwargs)
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+    def stats(self) -> dict:
+        """Статистика пула для мониторинга"""
+        return {
+            "max_connections": self.max_connections,
+            "in_use": len(self._in_use_connections),
+            "idle": len(self._available_connections),
+            "checkouts": self.checkouts,
+            "wait_time_avg_ms": round(self.wait_time_total / self.checkouts * 1000, 3)
+            if self.checkouts
+            else 0.0,
+            "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+        }
+
+
+# Глобальные экземпляры пула соединений и асинхронного Redis клиента
+redis_pool: MonitoredConnectionPool | None = None
 redis_client: Redis | None = None
 
 
@@ -11,7 +53,7 @@ def get_redis() -> Redis:
     Получить экземпляр Redis клиента.
 
     Returns:
-        Redis: Экземпляр клиента Redis
+        Redis: Экземпляр асинхронного клиента Redis (redis.asyncio)
 
     Raises:
         RuntimeError: Если Redis клиент не инициализирован
@@ -23,12 +65,19 @@ def get_redis() -> Redis:
     return redis_client
 
 
-def init_redis() -> Redis | None:
+def get_redis_pool_stats() -> dict | None:
+    """Статистика пула соединений Redis (None, если Redis отключен)"""
+    if redis_pool is None:
+        return None
+    return redis_pool.stats()
+
+
+async def init_redis() -> Redis | None:
     """
-    Инициализировать подключение к Redis.
+    Инициализировать пул соединений и подключение к Redis.
     При REDIS_ENABLED=false подключение не создаётся — токены хранятся в БД.
     """
-    global redis_client
+    global redis_client, redis_pool
 
     if not settings.REDIS_ENABLED:
         print("[INFO] Redis disabled (REDIS_ENABLED=false), tokens stored in DB")
@@ -37,18 +86,21 @@ def init_redis() -> Redis | None:
     # Собираем URL из отдельных параметров
     redis_url = f"redis://{settings.REDIS_USERNAME}:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
 
-    # Создаем клиент из URL
-    redis_client = Redis.from_url(
+    # Создаем пул соединений фиксированного размера, общий для всех запросов воркера
+    redis_pool = MonitoredConnectionPool.from_url(
         redis_url,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,  # Ожидание свободного соединения
         decode_responses=True,  # Автоматически декодировать ответы в строки
         socket_connect_timeout=5,  # Таймаут подключения
         socket_timeout=5,  # Таймаут операций
         retry_on_timeout=True,  # Повторять при таймауте
     )
+    redis_client = Redis(connection_pool=redis_pool)
 
     # Проверяем подключение
     try:
-        redis_client.ping()
+        await redis_client.ping()
         print("✓ Подключение к Redis установлено")
     except Exception as e:
         print(f"✗ Ошибка подключения к Redis: {e}")
@@ -57,12 +109,14 @@ def init_redis() -> Redis | None:
     return redis_client
 
 
-def close_redis() -> None:
+async def close_redis() -> None:
     """
-    Закрыть подключение к Redis.
+    Закрыть подключение и пул соединений Redis.
     """
-    global redis_client
+    global redis_client, redis_pool
     if redis_client is not None:
-        redis_client.close()
+        await redis_client.aclose()
+        await redis_pool.disconnect()
         redis_client = None
+        redis_pool = None
         print("✓ Подключение к Redis закрыто")
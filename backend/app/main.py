@@ -3,12 +3,15 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.middleware import logging_middleware
+from app.api.middleware import db_session_middleware, logging_middleware
 from app.api.routers import api_router
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import close_async_engine, init_db
 from app.core.logging_config import setup_logging
 from app.core.redis import close_redis, init_redis
+from app.security.password_hasher import password_hasher
+from app.services.access_token_denylist import access_token_denylist
+from app.services.jwt_tokens_sweeper import jwt_tokens_sweeper
 
 
 @asynccontextmanager
@@ -20,12 +23,23 @@ async def lifespan(_: FastAPI):
     # Инициализация при старте
     setup_logging(settings.LOG_LEVEL)
     init_db()
-    init_redis()
+    await init_redis()
+    if settings.ACCESS_TOKEN_STATELESS:
+        await access_token_denylist.start(settings.ACCESS_TOKEN_DENYLIST_SYNC_SECONDS)
+    if not settings.REDIS_ENABLED:
+        # В Redis токены удаляются по TTL, в БД их нужно чистить самим
+        jwt_tokens_sweeper.start(
+            settings.JWT_TOKENS_SWEEP_INTERVAL_SECONDS, settings.JWT_TOKENS_SWEEP_BATCH_SIZE
+        )
 
     yield
 
     # Закрытие при завершении
-    close_redis()
+    await jwt_tokens_sweeper.stop()
+    await access_token_denylist.stop()
+    await close_redis()
+    await close_async_engine()
+    password_hasher.shutdown()
 
 
 def create_app() -> FastAPI:
@@ -46,8 +60,13 @@ def create_app() -> FastAPI:
         allow_credentials=True,  # Для работы с cookies (JWT токены)
         allow_methods=["*"],
         allow_headers=["*"],
+        # Курсор следующей страницы GET /workouts и версия тренировки для If-Match
+        expose_headers=["X-Next-Cursor", "ETag"],
     )
 
+    # Подключаем middleware для единой сессии БД на запрос
+    app.middleware("http")(db_session_middleware)
+
     # Подключаем middleware для логирования
     app.middleware("http")(logging_middleware)
 
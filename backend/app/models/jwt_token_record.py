@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Literal
 
-from sqlalchemy import Boolean, DateTime, String
+from sqlalchemy import Boolean, DateTime, Index, String
 from sqlmodel import Field, SQLModel
 
 TokenType = Literal["refresh_token", "access_token"]
@@ -13,11 +13,15 @@ class JWTTokenRecord(SQLModel, table=True):
     """Запись JWT токена в БД."""
 
     __tablename__ = "jwt_token_record"
+    __table_args__ = (
+        # Поиск токена по хешу и типу (_get_token_data_by_hash)
+        Index("ix_jwt_token_record_token_hash_token_type", "token_hash", "token_type"),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     token_type: str = Field(sa_type=String(20), index=True)
     token_hash: str = Field(unique=True, index=True, sa_type=String(256))
-    expires_at: datetime = Field(sa_type=DateTime)
+    expires_at: datetime = Field(sa_type=DateTime, index=True)  # Для очистки истекших
     created_at: datetime = Field(sa_type=DateTime)
     revoked: bool = Field(default=False, sa_type=Boolean)
@@ -1,8 +1,10 @@
 from datetime import datetime
-from typing import Literal
+from typing import Literal, NamedTuple
 
 from pydantic import BaseModel
 
+from app.models.user import Principal
+
 TokenType = Literal["refresh_token", "access_token"]
 
 
@@ -16,3 +18,10 @@ class JWTToken(BaseModel):
     expires_at: datetime
     created_at: datetime
     revoked: bool = False
+
+
+class CachedAccessToken(NamedTuple):
+    """Результат проверки Access токена, хранимый в in-process кэше"""
+
+    principal: Principal
+    expires_at: datetime
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import NamedTuple
 
 import sqlalchemy as sa
 from sqlmodel import Field, SQLModel
@@ -19,3 +20,20 @@ class User(SQLModel, table=True):
             sa.Enum("admin", "user", name="userrole", native_enum=False), nullable=False
         ),
     )
+    # Поколение токенов: увеличивается при "выходе со всех устройств" (при REDIS_ENABLED=false)
+    token_generation: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # Счетчик изменений тренировок пользователя: ETag списка GET /workouts
+    workouts_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+
+
+class Principal(NamedTuple):
+    """
+    Аутентифицированный пользователь по данным из подписанного Access токена (без БД).
+
+    role — None для токенов, выпущенных до появления claim role: такую роль нужно
+    брать из полной записи User.
+    """
+
+    id: int
+    role: UserRole | None
+    token_generation: int
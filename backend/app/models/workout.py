@@ -1,22 +1,50 @@
-from datetime import date
+from dataclasses import dataclass
+from datetime import date, datetime
 from typing import Literal
 
-from pydantic import field_validator
-from sqlalchemy import JSON, Date, String
+from pydantic import BaseModel, field_validator, model_validator
+from sqlalchemy import JSON, Date, DateTime, Index, String
 from sqlmodel import Column, Field, SQLModel
 
 GymType = Literal["gym", "volleyball"]
+# Форматы файлов импорта/экспорта тренировок
+WorkoutFileFormat = Literal["ndjson", "csv"]
+# Поля тренировки, которые назначает сервер: из тела запроса они не принимаются
+WORKOUT_SERVER_FIELDS = frozenset(
+    {"id", "user_id", "version", "updated_at", "deleted_at", "change_seq"}
+)
 
 
 class Workout(SQLModel, table=True):
+    __table_args__ = (
+        # Список тренировок пользователя с keyset-пагинацией по id (_filter_workouts)
+        Index("ix_workout_user_id_id", "user_id", "id"),
+        # Список тренировок пользователя с фильтром по диапазону дат
+        Index("ix_workout_user_id_planned_date_id", "user_id", "planned_date", "id"),
+        # Список тренировок пользователя с фильтром по типу (и дате)
+        Index("ix_workout_user_id_type_planned_date", "user_id", "type", "planned_date"),
+        # Список тренировок пользователя с фильтром по длительности
+        Index("ix_workout_user_id_duration", "user_id", "duration"),
+        # Изменения тренировок пользователя после курсора (GET /workouts/changes)
+        Index("ix_workout_user_id_change_seq_id", "user_id", "change_seq", "id"),
+    )
+
     id: int | None = Field(primary_key=True, sa_column_kwargs={"autoincrement": True})
     user_id: int | None = Field(foreign_key="user.id")
     type: GymType = Field(sa_type=String)
     duration: int = Field(ge=1, description="Длительность в минутах, не менее 1")
     repetitions: int = Field(ge=0, description="Количество повторений, не менее 0")
-    planned_date: date | None = Field(sa_type=Date)
+    planned_date: date | None = Field(sa_type=Date, index=True)
     notes: str | None = Field()
     exercises: list[str] | None = Field(default_factory=list, sa_column=Column(JSON))
+    # Версия строки для оптимистичной блокировки (ETag/If-Match); растет при каждом изменении
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
+    # Время последнего изменения (создание, обновление, удаление)
+    updated_at: datetime | None = Field(default=None, sa_type=DateTime)
+    # Время мягкого удаления: удаленная тренировка остается надгробием для синхронизации
+    deleted_at: datetime | None = Field(default=None, sa_type=DateTime)
+    # Номер последнего изменения в последовательности пользователя (User.workouts_version)
+    change_seq: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
     @field_validator("planned_date", mode="before")
     @classmethod
@@ -26,3 +54,112 @@ class Workout(SQLModel, table=True):
             s = v.strip()
             return date.fromisoformat(s)
         return v
+
+
+class WorkoutRead(SQLModel):
+    """
+    Тренировка в ответах API.
+
+    Поля повторяют колонки Workout в том же порядке. Списки отдаются сериализацией
+    WorkoutRow из репозитория (см. ORJSONResponse), без пересборки в эту схему.
+    """
+
+    id: int
+    user_id: int
+    type: GymType
+    duration: int
+    repetitions: int
+    planned_date: date | None
+    notes: str | None
+    exercises: list[str] | None
+    version: int
+    updated_at: datetime | None
+    deleted_at: datetime | None
+    change_seq: int
+
+
+@dataclass(slots=True)
+class WorkoutRow:
+    """
+    Тренировка, прочитанная Core-запросом для списков: без ORM-инструментирования
+    атрибутов и identity map.
+
+    Поля те же, что у WorkoutRead. Dataclass со __slots__, а не NamedTuple: orjson
+    сериализует его в JSON-объект сам, а кортеж записал бы массивом.
+    """
+
+    id: int
+    user_id: int
+    type: GymType
+    duration: int
+    repetitions: int
+    planned_date: date | None
+    notes: str | None
+    exercises: list[str] | None
+    version: int
+    updated_at: datetime | None
+    deleted_at: datetime | None
+    change_seq: int
+
+
+class WorkoutPatch(SQLModel):
+    """Частичное обновление тренировки (PATCH): меняются только переданные поля"""
+
+    type: GymType | None = None
+    duration: int | None = Field(default=None, ge=1, description="Длительность в минутах")
+    repetitions: int | None = Field(default=None, ge=0, description="Количество повторений")
+    planned_date: date | None = None
+    notes: str | None = None
+    exercises: list[str] | None = None
+
+    @model_validator(mode="after")
+    def check_required_not_null(self):
+        """Обязательные поля тренировки можно не передавать, но нельзя обнулить"""
+        for name in ("type", "duration", "repetitions"):
+            if name in self.model_fields_set and getattr(self, name) is None:
+                raise ValueError(f"{name} cannot be null")
+        return self
+
+
+class WorkoutImportRow(BaseModel):
+    """
+    Строка импорта тренировок.
+
+    Повторяет поля и ограничения Workout, кроме назначаемых сервером id и user_id.
+    Обычная pydantic-модель валидируется в разы быстрее табличной SQLModel, что заметно
+    при импорте сотен тысяч строк.
+    """
+
+    type: GymType
+    duration: int = Field(ge=1, description="Длительность в минутах, не менее 1")
+    repetitions: int = Field(ge=0, description="Количество повторений, не менее 0")
+    planned_date: date | None = None
+    notes: str | None = None
+    exercises: list[str] | None = Field(default_factory=list)
+
+
+class WorkoutChanges(SQLModel):
+    """Изменения тренировок после курсора синхронизации (GET /workouts/changes)"""
+
+    changes: list[WorkoutRead] = Field(
+        description="Созданные, измененные и удаленные (deleted_at не null) тренировки"
+    )
+    next_cursor: str = Field(description="Курсор для следующего запроса (параметр since)")
+    has_more: bool = Field(description="Есть ли еще изменения сверх limit")
+
+
+class WorkoutImportError(SQLModel):
+    """Отклоненная строка импорта"""
+
+    line: int = Field(description="Номер строки во входных данных (с 1)")
+    error: str
+
+
+class WorkoutImportResult(SQLModel):
+    """Итог импорта тренировок"""
+
+    accepted: int = Field(description="Сколько тренировок сохранено")
+    rejected: int = Field(description="Сколько строк отклонено")
+    errors: list[WorkoutImportError] = Field(
+        default_factory=list, description="Ошибки первых отклоненных строк"
+    )
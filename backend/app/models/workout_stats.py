@@ -0,0 +1,62 @@
+"""Модель таблицы агрегатов статистики тренировок (обновляется вместе с workout)."""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Literal, NamedTuple
+
+from sqlalchemy import String
+from sqlmodel import Field, SQLModel
+
+# Вид корзины агрегата: общие итоги, по типу тренировки, по запланированной дате
+StatsBucketKind = Literal["total", "type", "date"]
+
+# Интервал группировки временного ряда статистики
+TimeseriesBucket = Literal["day", "week", "month"]
+
+
+class WorkoutStats(SQLModel, table=True):
+    """
+    Счетчики тренировок в корзине (kind, key).
+
+    kind="total", key="" — все тренировки; kind="type", key=тип тренировки;
+    kind="date", key=запланированная дата в ISO-формате.
+    """
+
+    __tablename__ = "workout_stats"
+
+    kind: str = Field(primary_key=True, sa_type=String(10))
+    key: str = Field(primary_key=True, sa_type=String(32))
+    workouts_count: int = Field(default=0)
+    total_duration: int = Field(default=0)
+
+
+class WorkoutStatsSummary(NamedTuple):
+    """Статистика для GET /stats"""
+
+    trains_amount: int
+    trains_duration: int
+    trains_by_type: int
+    trains_by_date: int
+
+
+class StatsTimeseriesPoint(SQLModel):
+    """Точка временного ряда GET /stats/timeseries: тренировки за один интервал"""
+
+    bucket: date = Field(description="Начало интервала (день, понедельник недели, 1-е число)")
+    count: int
+    total_duration: int
+    avg_repetitions: float
+
+
+@dataclass(slots=True)
+class StatsTimeseriesRow:
+    """
+    Точка временного ряда, прочитанная Core-запросом (поля как у StatsTimeseriesPoint).
+
+    Отдается в ответ orjson напрямую, без сборки pydantic-модели на каждую точку.
+    """
+
+    bucket: date
+    count: int
+    total_duration: int
+    avg_repetitions: float
@@ -1,20 +1,93 @@
-import json
 from datetime import datetime, timedelta
 
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+from sqlalchemy import and_, delete, or_, select, update
+
 from app.core.config import settings
-from app.core.database import get_db_session
+from app.core.database import get_async_db_session
 from app.core.redis import get_redis
 from app.models.jwt_token_record import JWTTokenRecord
 from app.models.jwt_tokens import JWTToken, TokenType
+from app.models.user import User
 from app.security.token import hash_token
 
+# Ключ Redis (sorted set) с отозванными Access токенами stateless-режима: score — exp токена
+REVOKED_ACCESS_TOKENS_KEY = "revoked_access_tokens"
+
+# Lua-скрипт атомарного обновления статуса revoked (один round trip, TTL ключа сохраняется).
+# KEYS[1] - ключ токена, ARGV[1] - новое значение revoked ("0"/"1")
+REVOKE_TOKEN_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'revoked', ARGV[1])
+return 1
+"""
+
+# Lua-скрипт атомарной ротации Refresh токена: проверить, что старый токен существует,
+# не отозван и принадлежит пользователю, отозвать его и сохранить новый Refresh токен и
+# (если передан KEYS[3]) новый Access токен. Повторное использование старого токена вернет 0.
+# KEYS[1] - старый Refresh токен, KEYS[2] - новый Refresh токен, KEYS[3] - новый Access токен
+# ARGV[1] - user_id; ARGV[2..5] - token_hash, expires_at, created_at, TTL (сек) нового
+# Refresh токена; ARGV[6..9] - то же для нового Access токена
+ROTATE_REFRESH_TOKEN_SCRIPT = """
+local old = redis.call('HMGET', KEYS[1], 'revoked', 'user_id')
+if old[1] ~= '0' or old[2] ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'revoked', '1')
+for i = 2, #KEYS do
+    local offset = (i - 2) * 4
+    redis.call(
+        'HSET', KEYS[i],
+        'user_id', ARGV[1], 'token_hash', ARGV[offset + 2], 'expires_at', ARGV[offset + 3],
+        'created_at', ARGV[offset + 4], 'revoked', '0'
+    )
+    redis.call('EXPIRE', KEYS[i], ARGV[offset + 5])
+end
+return 1
+"""
+
 
 class JWTTokensRepository:
-    """Репозиторий для работы с JWT токенами (Redis или БД при REDIS_ENABLED=false)."""
+    """
+    Репозиторий для работы с JWT токенами (Redis или БД при REDIS_ENABLED=false).
+
+    В Redis токен хранится как hash (HSET) с TTL до истечения токена, поэтому
+    отзыв и ротация выполняются атомарно на сервере одним round trip.
+    """
+
+    def __init__(self):
+        # Lua-скрипты, зарегистрированные в текущем клиенте Redis (см. _get_script)
+        self._scripts_client: Redis | None = None
+        self._scripts: dict[str, AsyncScript] = {}
+
+    def _get_script(self, redis: Redis, source: str) -> AsyncScript:
+        """
+        Lua-скрипт, зарегистрированный в клиенте Redis один раз.
+
+        Объект скрипта хранит SHA и вызывается через EVALSHA (EVAL — только если скрипта
+        еще нет в кэше сервера). Клиент пересоздается в init_redis, поэтому при смене
+        клиента скрипты регистрируются заново.
+        """
+        if self._scripts_client is not redis:
+            self._scripts_client = redis
+            self._scripts = {}
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = redis.register_script(source)
+        return script
 
     def _get_redis_key(self, token_type: TokenType, token_hash: str) -> str:
-        """Получить ключ Redis для токена"""
-        return f"{token_type}:{token_hash}"
+        """
+        Получить ключ Redis для токена.
+
+        Префикс v2: раньше под ключами jwt:{token_type}:{hash} хранились JSON-строки, и
+        HGETALL/HSET по такому ключу падали бы с WRONGTYPE. Старые ключи не читаются
+        (такие токены считаются отсутствующими) и удаляются по своему TTL.
+        """
+        return f"jwt:v2:{token_type}:{token_hash}"
 
     def _serialize_token_data(
         self,
@@ -24,25 +97,25 @@ class JWTTokensRepository:
         created_at: datetime,
         revoked: bool = False,
     ) -> dict:
-        """Сериализация данных токена для хранения в Redis"""
+        """Сериализация данных токена в поля Redis hash"""
         token_data = {
             "user_id": user_id,
             "token_hash": token_hash,
             "expires_at": expires_at.isoformat(),
             "created_at": created_at.isoformat(),
-            "revoked": revoked,
+            "revoked": int(revoked),
         }
         return token_data
 
     def _deserialize_token_data(self, data: dict, token_type: TokenType) -> JWTToken:
         """Универсальная десериализация данных токена из Redis/БД"""
         return JWTToken(
-            user_id=data["user_id"],
+            user_id=int(data["user_id"]),
             token_type=token_type,
             token_hash=data["token_hash"],
             expires_at=datetime.fromisoformat(data["expires_at"]),
             created_at=datetime.fromisoformat(data["created_at"]),
-            revoked=data.get("revoked", False),
+            revoked=str(data.get("revoked", 0)) in ("1", "True"),
         )
 
     def _deserialize_refresh_token(self, data: dict) -> JWTToken:
@@ -53,78 +126,89 @@ class JWTTokensRepository:
         """Десериализация данных access токена из Redis"""
         return self._deserialize_token_data(data, "access_token")
 
-    def _save_token(
+    def _build_token(
         self, token_type: TokenType, user_id: int, token: str, expire_minutes: int
-    ) -> tuple[str, datetime, datetime]:
-        """Сохранить токен в Redis или в БД (при REDIS_ENABLED=false)."""
-        token_hash = hash_token(token)
+    ) -> JWTToken:
+        """Сформировать данные нового (не отозванного) токена"""
         created_at = datetime.now()
-        expires_at = created_at + timedelta(minutes=expire_minutes)
+        return JWTToken(
+            user_id=user_id,
+            token_type=token_type,
+            token_hash=hash_token(token),
+            expires_at=created_at + timedelta(minutes=expire_minutes),
+            created_at=created_at,
+            revoked=False,
+        )
+
+    def _to_record(self, jwt_token: JWTToken) -> JWTTokenRecord:
+        """Преобразовать JWTToken в запись таблицы jwt_token_record"""
+        return JWTTokenRecord(
+            user_id=jwt_token.user_id,
+            token_type=jwt_token.token_type,
+            token_hash=jwt_token.token_hash,
+            expires_at=jwt_token.expires_at,
+            created_at=jwt_token.created_at,
+            revoked=jwt_token.revoked,
+        )
+
+    def _ttl_seconds(self, jwt_token: JWTToken) -> int:
+        """TTL ключа Redis: до истечения токена"""
+        return max(1, int((jwt_token.expires_at - jwt_token.created_at).total_seconds()))
+
+    async def _save_token(
+        self, token_type: TokenType, user_id: int, token: str, expire_minutes: int
+    ) -> JWTToken:
+        """Сохранить токен в Redis или в БД (при REDIS_ENABLED=false)."""
+        jwt_token = self._build_token(token_type, user_id, token, expire_minutes)
 
         if settings.REDIS_ENABLED:
             redis = get_redis()
+            redis_key = self._get_redis_key(token_type, jwt_token.token_hash)
             token_data = self._serialize_token_data(
-                user_id=user_id,
-                token_hash=token_hash,
-                expires_at=expires_at,
-                created_at=created_at,
+                user_id=jwt_token.user_id,
+                token_hash=jwt_token.token_hash,
+                expires_at=jwt_token.expires_at,
+                created_at=jwt_token.created_at,
                 revoked=False,
             )
-            redis_key = self._get_redis_key(token_type, token_hash)
-            redis.setex(
-                redis_key,
-                int((expires_at - created_at).total_seconds()),
-                json.dumps(token_data),
-            )
+            # HSET и EXPIRE в одной транзакции (MULTI/EXEC) — один round trip
+            async with redis.pipeline() as pipe:
+                pipe.hset(redis_key, mapping=token_data)
+                pipe.expire(redis_key, self._ttl_seconds(jwt_token))
+                await pipe.execute()
         else:
-            with get_db_session() as db:
-                record = JWTTokenRecord(
-                    user_id=user_id,
-                    token_type=token_type,
-                    token_hash=token_hash,
-                    expires_at=expires_at,
-                    created_at=created_at,
-                    revoked=False,
-                )
-                db.add(record)
-        return token_hash, created_at, expires_at
+            async with get_async_db_session() as db:
+                db.add(self._to_record(jwt_token))
+                await db.flush()  # Запись должна быть видна следующим запросам в той же сессии
+        return jwt_token
 
     # Создание refresh токена
-    def create_refresh_token(self, user_id: int, token: str) -> JWTToken:
+    async def create_refresh_token(self, user_id: int, token: str) -> JWTToken:
         """Создание refresh токена"""
-        token_hash, created_at, expires_at = self._save_token(
+        return await self._save_token(
             "refresh_token", user_id, token, settings.REFRESH_TOKEN_EXPIRE_MINUTES
         )
 
-        # Возвращаем объект JWTToken
-        return JWTToken(
-            user_id=user_id,
-            token_type="refresh_token",
-            token_hash=token_hash,
-            expires_at=expires_at,
-            created_at=created_at,
-            revoked=False,
-        )
-
-    def _get_token_data_by_hash(self, token: str, token_type: TokenType) -> dict | None:
+    async def _get_token_data_by_hash(self, token: str, token_type: TokenType) -> dict | None:
         """Универсальный метод для получения данных токена по хешу (Redis или БД)."""
         token_hash = hash_token(token)
 
         if settings.REDIS_ENABLED:
             redis = get_redis()
             redis_key = self._get_redis_key(token_type, token_hash)
-            token_data_str = redis.get(redis_key)
-            return json.loads(token_data_str)
+            # HGETALL несуществующего ключа возвращает пустой словарь
+            return await redis.hgetall(redis_key) or None
 
-        with get_db_session() as db:
-            row = (
-                db.query(JWTTokenRecord)
-                .filter(
+        async with get_async_db_session() as db:
+            result = await db.execute(
+                select(JWTTokenRecord).filter(
                     JWTTokenRecord.token_hash == token_hash,
                     JWTTokenRecord.token_type == token_type,
                 )
-                .first()
             )
+            row = result.scalars().first()
+            if row is None:
+                return None
             return {
                 "user_id": row.user_id,
                 "token_hash": row.token_hash,
@@ -133,14 +217,14 @@ class JWTTokensRepository:
                 "revoked": row.revoked,
             }
 
-    def get_token_by_hash(self, token: str, token_type: TokenType) -> JWTToken | None:
+    async def get_token_by_hash(self, token: str, token_type: TokenType) -> JWTToken | None:
         """Универсальный метод для получения токена по хешу"""
-        token_data = self._get_token_data_by_hash(token, token_type)
+        token_data = await self._get_token_data_by_hash(token, token_type)
         if not token_data:
             return None
         return self._deserialize_token_data(token_data, token_type)
 
-    def _update_token_revoked(
+    async def _update_token_revoked(
         self, token: str, token_type: TokenType, revoked: bool = True
     ) -> bool:
         """Универсальный метод для обновления статуса revoked токена (Redis или БД)."""
@@ -149,69 +233,253 @@ class JWTTokensRepository:
         if settings.REDIS_ENABLED:
             redis = get_redis()
             redis_key = self._get_redis_key(token_type, token_hash)
-            token_data_str = redis.get(redis_key)
-            token_data = json.loads(token_data_str)
-            token_data["revoked"] = revoked
-            ttl = redis.ttl(redis_key)
-            if ttl < 0:
-                expires_at = datetime.fromisoformat(token_data["expires_at"])
-                now = datetime.now()
-                ttl = max(0, int((expires_at - now).total_seconds()))
-            redis.setex(redis_key, ttl, json.dumps(token_data))
-            return True
+            revoke_script = self._get_script(redis, REVOKE_TOKEN_SCRIPT)
+            return bool(await revoke_script(keys=[redis_key], args=[int(revoked)]))
 
-        with get_db_session() as db:
-            row = (
-                db.query(JWTTokenRecord)
-                .filter(
+        async with get_async_db_session() as db:
+            result = await db.execute(
+                update(JWTTokenRecord)
+                .where(
                     JWTTokenRecord.token_hash == token_hash,
                     JWTTokenRecord.token_type == token_type,
                 )
-                .first()
+                .values(revoked=revoked)
             )
-            row.revoked = revoked
-            return True
+            return result.rowcount > 0
 
     # Получение refresh токена по хешу
-    def get_refresh_token_by_hash(self, token: str) -> JWTToken | None:
+    async def get_refresh_token_by_hash(self, token: str) -> JWTToken | None:
         """Получение refresh токена по хешу токена"""
-        return self.get_token_by_hash(token, "refresh_token")
+        return await self.get_token_by_hash(token, "refresh_token")
 
     # Обновление статуса revoked для refresh токена
-    def update_refresh_token_revoked(self, token: str, revoked: bool = True) -> bool:
+    async def update_refresh_token_revoked(self, token: str, revoked: bool = True) -> bool:
         """Обновление статуса revoked для refresh токена"""
-        return self.update_token_revoked(token, "refresh_token", revoked)
+        return await self.update_token_revoked(token, "refresh_token", revoked)
 
-    def update_token_revoked(self, token: str, token_type: TokenType, revoked: bool = True) -> bool:
+    async def update_token_revoked(
+        self, token: str, token_type: TokenType, revoked: bool = True
+    ) -> bool:
         """Универсальный метод для обновления статуса revoked токена"""
-        return self._update_token_revoked(token, token_type, revoked)
+        return await self._update_token_revoked(token, token_type, revoked)
+
+    # Ротация refresh токена
+    async def rotate_refresh_token(
+        self, user_id: int, old_token: str, new_refresh_token: str, new_access_token: str | None
+    ) -> tuple[JWTToken, JWTToken | None] | None:
+        """
+        Атомарная ротация refresh токена: проверить и отозвать старый refresh токен,
+        сохранить новый refresh токен и новый access токен.
+
+        Старый токен должен существовать, принадлежать user_id, не быть отозванным и
+        не истечь, иначе ничего не сохраняется и возвращается None (защита от повторного
+        использования). Redis — один Lua-скрипт, БД — условный UPDATE и один INSERT
+        в одной транзакции. new_access_token=None — access токен не сохраняется
+        (stateless-режим).
+        """
+        old_token_hash = hash_token(old_token)
+        new_tokens = [
+            self._build_token(
+                "refresh_token", user_id, new_refresh_token, settings.REFRESH_TOKEN_EXPIRE_MINUTES
+            )
+        ]
+        if new_access_token is not None:
+            new_tokens.append(
+                self._build_token(
+                    "access_token", user_id, new_access_token, settings.ACCESS_TOKEN_EXPIRE_MINUTES
+                )
+            )
+
+        if settings.REDIS_ENABLED:
+            redis = get_redis()
+            args = [user_id]
+            for jwt_token in new_tokens:
+                args += [
+                    jwt_token.token_hash,
+                    jwt_token.expires_at.isoformat(),
+                    jwt_token.created_at.isoformat(),
+                    self._ttl_seconds(jwt_token),
+                ]
+            rotate_script = self._get_script(redis, ROTATE_REFRESH_TOKEN_SCRIPT)
+            rotated = await rotate_script(
+                keys=[
+                    self._get_redis_key("refresh_token", old_token_hash),
+                    *(
+                        self._get_redis_key(jwt_token.token_type, jwt_token.token_hash)
+                        for jwt_token in new_tokens
+                    ),
+                ],
+                args=args,
+            )
+            if not rotated:
+                return None
+        else:
+            async with get_async_db_session() as db:
+                result = await db.execute(
+                    update(JWTTokenRecord)
+                    .where(
+                        JWTTokenRecord.token_hash == old_token_hash,
+                        JWTTokenRecord.token_type == "refresh_token",
+                        JWTTokenRecord.user_id == user_id,
+                        JWTTokenRecord.revoked.is_(False),
+                        JWTTokenRecord.expires_at > datetime.now(),
+                    )
+                    .values(revoked=True)
+                )
+                if result.rowcount == 0:
+                    return None
+                db.add_all([self._to_record(jwt_token) for jwt_token in new_tokens])
+                await db.flush()
+
+        return new_tokens[0], new_tokens[1] if len(new_tokens) > 1 else None
 
     # Создание access токена
-    def create_access_token(self, user_id: int, token: str) -> JWTToken:
+    async def create_access_token(self, user_id: int, token: str) -> JWTToken:
         """Создание access токена и сохранение в Redis/БД"""
-        token_hash, created_at, expires_at = self._save_token(
+        return await self._save_token(
             "access_token", user_id, token, settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
-        # Возвращаем объект JWTToken
-        return JWTToken(
-            user_id=user_id,
-            token_type="access_token",
-            token_hash=token_hash,
-            expires_at=expires_at,
-            created_at=created_at,
-            revoked=False,
-        )
+    async def create_revoked_access_token(
+        self, user_id: int, token: str, expires_at: datetime
+    ) -> bool:
+        """
+        Сохранить отозванный Access токен stateless-режима (денайлист в Redis/БД).
+
+        Хранится только хеш и срок действия: после exp запись больше не нужна.
+        """
+        token_hash = hash_token(token)
+
+        if settings.REDIS_ENABLED:
+            redis = get_redis()
+            async with redis.pipeline() as pipe:
+                pipe.zadd(REVOKED_ACCESS_TOKENS_KEY, {token_hash: expires_at.timestamp()})
+                # Заодно удаляем токены, срок действия которых уже истёк
+                pipe.zremrangebyscore(REVOKED_ACCESS_TOKENS_KEY, "-inf", datetime.now().timestamp())
+                await pipe.execute()
+            return True
+
+        async with get_async_db_session() as db:
+            result = await db.execute(
+                select(JWTTokenRecord).filter(JWTTokenRecord.token_hash == token_hash)
+            )
+            row = result.scalars().first()
+            if row:
+                row.revoked = True
+            else:
+                db.add(
+                    JWTTokenRecord(
+                        user_id=user_id,
+                        token_type="access_token",
+                        token_hash=token_hash,
+                        expires_at=expires_at,
+                        created_at=datetime.now(),
+                        revoked=True,
+                    )
+                )
+            await db.flush()
+            return True
+
+    async def get_revoked_access_tokens(self) -> dict[str, datetime]:
+        """Получить хеши отозванных и ещё не истекших Access токенов с их сроком действия"""
+        now = datetime.now()
+
+        if settings.REDIS_ENABLED:
+            redis = get_redis()
+            items = await redis.zrangebyscore(
+                REVOKED_ACCESS_TOKENS_KEY, now.timestamp(), "+inf", withscores=True
+            )
+            return {token_hash: datetime.fromtimestamp(score) for token_hash, score in items}
+
+        async with get_async_db_session() as db:
+            result = await db.execute(
+                select(JWTTokenRecord.token_hash, JWTTokenRecord.expires_at).filter(
+                    JWTTokenRecord.token_type == "access_token",
+                    JWTTokenRecord.revoked.is_(True),
+                    JWTTokenRecord.expires_at > now,
+                )
+            )
+            return dict(result.all())
+
+    def _get_token_generation_key(self, user_id: int) -> str:
+        """Получить ключ Redis для поколения токенов пользователя"""
+        return f"jwt:generation:{user_id}"
+
+    async def get_token_generation(self, user_id: int) -> int:
+        """Получить текущее поколение токенов пользователя (Redis или БД)"""
+        if settings.REDIS_ENABLED:
+            redis = get_redis()
+            return int(await redis.get(self._get_token_generation_key(user_id)) or 0)
+
+        async with get_async_db_session() as db:
+            token_generation = await db.scalar(
+                select(User.token_generation).filter(User.id == user_id)
+            )
+            return token_generation or 0
+
+    async def increment_token_generation(self, user_id: int) -> int:
+        """
+        Увеличить поколение токенов пользователя одной записью (INCR в Redis или
+        UPDATE в БД): все ранее выпущенные токены пользователя перестают приниматься.
+
+        Returns:
+            int: Новое поколение токенов
+        """
+        if settings.REDIS_ENABLED:
+            redis = get_redis()
+            return await redis.incr(self._get_token_generation_key(user_id))
+
+        async with get_async_db_session() as db:
+            token_generation = await db.scalar(
+                update(User)
+                .where(User.id == user_id)
+                .values(token_generation=User.token_generation + 1)
+                .returning(User.token_generation)
+            )
+            return token_generation or 0
+
+    async def delete_expired_tokens(self, batch_size: int) -> int:
+        """
+        Удалить из БД пачку (не более batch_size) истекших или отозванных токенов.
+
+        Каждый вызов — отдельная короткая транзакция: id выбираются чтением по индексу,
+        а блокировка на запись берется только на время удаления по первичному ключу.
+        Отозванные Access токены хранятся до истечения: в stateless-режиме это денайлист.
+        В Redis токены удаляются сами по TTL, поэтому метод работает только с БД.
+
+        Returns:
+            int: Количество удаленных записей
+        """
+        async with get_async_db_session() as db:
+            result = await db.execute(
+                select(JWTTokenRecord.id)
+                .filter(
+                    or_(
+                        JWTTokenRecord.expires_at <= datetime.now(),
+                        and_(
+                            JWTTokenRecord.token_type == "refresh_token",
+                            JWTTokenRecord.revoked.is_(True),
+                        ),
+                    )
+                )
+                .limit(batch_size)
+            )
+            token_ids = result.scalars().all()
+            if not token_ids:
+                return 0
+
+            await db.execute(delete(JWTTokenRecord).filter(JWTTokenRecord.id.in_(token_ids)))
+            return len(token_ids)
 
     # Получение access токена по хешу
-    def get_access_token_by_hash(self, token: str) -> JWTToken | None:
+    async def get_access_token_by_hash(self, token: str) -> JWTToken | None:
         """Получение access токена по хешу токена"""
-        return self.get_token_by_hash(token, "access_token")
+        return await self.get_token_by_hash(token, "access_token")
 
     # Обновление статуса revoked для access токена
-    def update_access_token_revoked(self, token: str, revoked: bool = True) -> bool:
+    async def update_access_token_revoked(self, token: str, revoked: bool = True) -> bool:
         """Обновление статуса revoked для access токена"""
-        return self.update_token_revoked(token, "access_token", revoked)
+        return await self.update_token_revoked(token, "access_token", revoked)
 
 
 # Глобальный экземпляр репозитория
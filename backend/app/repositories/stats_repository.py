@@ -1,36 +1,251 @@
+from collections import defaultdict
+from collections.abc import Iterable
 from datetime import date
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import Date, cast, delete, func, insert, select, tuple_, type_coerce
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.workout import GymType, Workout
-from app.utils.db_decorator import with_db_session
+from app.models.workout import GymType, Workout, WorkoutImportRow
+from app.models.workout_stats import (
+    StatsBucketKind,
+    StatsTimeseriesRow,
+    TimeseriesBucket,
+    WorkoutStats,
+    WorkoutStatsSummary,
+)
+from app.utils.db_decorator import with_async_db_session
+
+# Корзина агрегата: (kind, key) — первичный ключ workout_stats
+StatsBucket = tuple[StatsBucketKind, str]
+TOTAL_BUCKET: StatsBucket = ("total", "")
 
 
 class StatsRepository:
-    """Репозиторий для работы с тренировками (пока в памяти)"""
+    """
+    Репозиторий для статистики тренировок.
+
+    Статистика читается из таблицы агрегатов workout_stats, а не считается по workout:
+    WorkoutRepository обновляет счетчики в той же транзакции, что и сами тренировки.
+    """
+
+    def _get_workout_buckets(self, workout: Workout | WorkoutImportRow) -> list[StatsBucket]:
+        """Корзины агрегатов, в которые попадает тренировка"""
+        buckets: list[StatsBucket] = [TOTAL_BUCKET, ("type", workout.type)]
+        if workout.planned_date is not None:
+            buckets.append(("date", workout.planned_date.isoformat()))
+        return buckets
+
+    async def apply_workout_changes(
+        self,
+        db: AsyncSession,
+        removed: Iterable[Workout] = (),
+        added: Iterable[Workout | WorkoutImportRow] = (),
+    ) -> None:
+        """
+        Обновить агрегаты при удалении/добавлении тренировок (изменение = удаление старой
+        версии + добавление новой).
+
+        Выполняется в сессии db вызывающего репозитория, то есть в той же транзакции.
+        Счетчики меняются одним INSERT ... ON CONFLICT DO UPDATE на инкременты, поэтому
+        параллельные транзакции не теряют обновления друг друга.
+        """
+        deltas: dict[StatsBucket, list[int]] = defaultdict(lambda: [0, 0])
+        for workouts, sign in ((removed, -1), (added, 1)):
+            for workout in workouts:
+                for bucket in self._get_workout_buckets(workout):
+                    deltas[bucket][0] += sign
+                    deltas[bucket][1] += sign * workout.duration
+
+        rows = [
+            {"kind": kind, "key": key, "workouts_count": count, "total_duration": duration}
+            for (kind, key), (count, duration) in deltas.items()
+            if count or duration
+        ]
+        if not rows:
+            return
+
+        # Строки передаются параметрами (executemany), а не через values(rows): так
+        # скомпилированный запрос кэшируется и не пересобирается для каждой пачки
+        upsert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        statement = upsert(WorkoutStats)
+        statement = statement.on_conflict_do_update(
+            index_elements=["kind", "key"],
+            set_={
+                "workouts_count": WorkoutStats.workouts_count + statement.excluded.workouts_count,
+                "total_duration": WorkoutStats.total_duration + statement.excluded.total_duration,
+            },
+        )
+        await db.execute(statement, rows)
+
+    @with_async_db_session()
+    async def get_stats(
+        self, db: AsyncSession, type: GymType | None = None, date: date | None = None
+    ) -> WorkoutStatsSummary:
+        """Получить статистику одним запросом по первичному ключу workout_stats"""
+        type_bucket: StatsBucket = ("type", type or "")
+        date_bucket: StatsBucket = ("date", date.isoformat() if date else "")
+        result = await db.execute(
+            select(
+                WorkoutStats.kind,
+                WorkoutStats.key,
+                WorkoutStats.workouts_count,
+                WorkoutStats.total_duration,
+            ).filter(
+                tuple_(WorkoutStats.kind, WorkoutStats.key).in_(
+                    [TOTAL_BUCKET, type_bucket, date_bucket]
+                )
+            )
+        )
+        stats = {(row.kind, row.key): row for row in result}
+
+        total = stats.get(TOTAL_BUCKET)
+        by_type = stats.get(type_bucket)
+        by_date = stats.get(date_bucket)
+        return WorkoutStatsSummary(
+            trains_amount=total.workouts_count if total else 0,
+            trains_duration=total.total_duration if total else 0,
+            trains_by_type=by_type.workouts_count if by_type else 0,
+            trains_by_date=by_date.workouts_count if by_date else 0,
+        )
+
+    def _get_timeseries_bucket_expression(self, dialect: str, bucket: TimeseriesBucket):
+        """SQL-выражение начала интервала для planned_date (день, неделя с понедельника, месяц)"""
+        if dialect == "postgresql":
+            return cast(func.date_trunc(bucket, Workout.planned_date), Date)
+
+        # SQLite: даты хранятся строками YYYY-MM-DD
+        if bucket == "week":
+            # Ближайшее воскресенье (или тот же день) минус 6 дней — понедельник недели
+            return func.date(Workout.planned_date, "weekday 0", "-6 days")
+        if bucket == "month":
+            return func.strftime("%Y-%m-01", Workout.planned_date)
+        return func.date(Workout.planned_date)
+
+    @with_async_db_session()
+    async def get_timeseries(
+        self,
+        db: AsyncSession,
+        date_from: date,
+        date_to: date,
+        bucket: TimeseriesBucket = "day",
+        type: GymType | None = None,
+    ) -> list[StatsTimeseriesRow]:
+        """
+        Получить статистику по интервалам одним сгруппированным запросом.
+
+        Диапазон дат выбирается по индексу на planned_date, интервалы без тренировок
+        в результат не попадают. Удаленные тренировки не учитываются.
+        """
+        # type_coerce: на SQLite выражение возвращает строку, а в результате нужен date
+        bucket_start = type_coerce(
+            self._get_timeseries_bucket_expression(db.get_bind().dialect.name, bucket), Date
+        ).label("bucket")
+        query = (
+            select(
+                bucket_start,
+                func.count(),
+                func.sum(Workout.duration),
+                func.avg(Workout.repetitions),
+            )
+            .filter(Workout.planned_date >= date_from, Workout.planned_date <= date_to)
+            .filter(Workout.deleted_at.is_(None))
+            .group_by(bucket_start)
+            .order_by(bucket_start)
+        )
+        if type is not None:
+            query = query.filter(Workout.type == type)
+
+        result = await db.execute(query)
+        return [
+            StatsTimeseriesRow(bucket_date, count, total_duration, round(float(avg_repetitions), 2))
+            for bucket_date, count, total_duration, avg_repetitions in result
+        ]
+
+    async def _compute_workout_stats(self, db: AsyncSession) -> dict[StatsBucket, tuple[int, int]]:
+        """Посчитать агрегаты с нуля полным проходом по неудаленным тренировкам"""
+        stats: dict[StatsBucket, tuple[int, int]] = {}
+        alive = Workout.deleted_at.is_(None)
+
+        total = (
+            await db.execute(
+                select(func.count(), func.coalesce(func.sum(Workout.duration), 0)).filter(alive)
+            )
+        ).one()
+        if total[0]:
+            stats[TOTAL_BUCKET] = (total[0], total[1])
+
+        by_type = await db.execute(
+            select(Workout.type, func.count(), func.sum(Workout.duration))
+            .filter(alive)
+            .group_by(Workout.type)
+        )
+        for type, count, duration in by_type:
+            stats[("type", type)] = (count, duration)
+
+        by_date = await db.execute(
+            select(Workout.planned_date, func.count(), func.sum(Workout.duration))
+            .filter(Workout.planned_date.is_not(None), alive)
+            .group_by(Workout.planned_date)
+        )
+        for planned_date, count, duration in by_date:
+            stats[("date", planned_date.isoformat())] = (count, duration)
+
+        return stats
+
+    @with_async_db_session()
+    async def rebuild_workout_stats(
+        self, db: AsyncSession, apply: bool = True
+    ) -> dict[StatsBucket, tuple[tuple[int, int], tuple[int, int]]]:
+        """
+        Пересчитать агрегаты по таблице workout и сравнить с сохраненными.
 
-    @with_db_session()
-    def get_global_trains_amount(self, db: Session) -> int:
-        """Получить общее количество тренировок"""
-        return db.query(Workout).count()
+        Args:
+            apply: Если True, заменить содержимое workout_stats пересчитанными значениями
+                (в одной транзакции), иначе только проверить
 
-    @with_db_session()
-    def get_global_trains_duration(self, db: Session) -> int:
-        """Получить общую длительность тренировок"""
-        result = db.query(func.sum(Workout.duration)).scalar()
-        return result
+        Returns:
+            Расхождения: корзина → ((count, duration) сохраненные, (count, duration) реальные)
+        """
+        actual = await self._compute_workout_stats(db)
+        result = await db.execute(
+            select(
+                WorkoutStats.kind,
+                WorkoutStats.key,
+                WorkoutStats.workouts_count,
+                WorkoutStats.total_duration,
+            )
+        )
+        stored = {
+            (kind, key): (count, duration)
+            for kind, key, count, duration in result
+            if count or duration
+        }
 
-    @with_db_session()
-    def get_global_trains_by_type(self, db: Session, type: GymType) -> int:
-        """Получить количество тренировок по типу"""
-        return db.query(Workout).filter(Workout.type == type).count()
+        mismatches = {
+            bucket: (stored.get(bucket, (0, 0)), actual.get(bucket, (0, 0)))
+            for bucket in stored.keys() | actual.keys()
+            if stored.get(bucket) != actual.get(bucket)
+        }
 
-    @with_db_session()
-    def get_global_trains_by_date(self, db: Session, date: date) -> int:
-        """Получить количество тренировок по дате"""
-        return db.query(Workout).filter(Workout.planned_date == date).count()
+        if apply and mismatches:
+            await db.execute(delete(WorkoutStats))
+            if actual:
+                await db.execute(
+                    insert(WorkoutStats),
+                    [
+                        {
+                            "kind": kind,
+                            "key": key,
+                            "workouts_count": count,
+                            "total_duration": duration,
+                        }
+                        for (kind, key), (count, duration) in actual.items()
+                    ],
+                )
+        return mismatches
 
 
-# Глобальный экземпляр репозитория (в будущем будет заменен на работу с БД)
+# Глобальный экземпляр репозитория
 stats_repository = StatsRepository()
@@ -1,24 +1,27 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
-from app.utils.db_decorator import with_db_session
+from app.utils.db_decorator import with_async_db_session
 
 
 class UserRepository:
     """Репозиторий для работы с пользователями (пока в памяти)"""
 
-    @with_db_session()
-    def get_user_by_id(self, db: Session, user_id: int) -> User:
+    @with_async_db_session()
+    async def get_user_by_id(self, db: AsyncSession, user_id: int) -> User:
         """Получение пользователя по ID"""
-        user = db.query(User).filter(User.id == user_id).first()
+        result = await db.execute(select(User).filter(User.id == user_id))
+        user = result.scalars().first()
         if user:
             db.expunge(user)
         return user
 
-    @with_db_session()
-    def get_user_by_username(self, db: Session, username: str) -> User:
+    @with_async_db_session()
+    async def get_user_by_username(self, db: AsyncSession, username: str) -> User:
         """Получение пользователя по username"""
-        user = db.query(User).filter(User.username == username).first()
+        result = await db.execute(select(User).filter(User.username == username))
+        user = result.scalars().first()
         if user:
             db.expunge(user)
         return user
@@ -1,10 +1,43 @@
-from datetime import date
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import fields
+from datetime import date, datetime
 
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    Row,
+    and_,
+    column,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    table,
+    tuple_,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.workout import GymType, Workout
+from app.core.database import AsyncSessionLocal
+from app.models.user import User
+from app.models.workout import (
+    WORKOUT_SERVER_FIELDS,
+    GymType,
+    Workout,
+    WorkoutImportRow,
+    WorkoutRow,
+)
+from app.repositories.stats_repository import stats_repository
 from app.utils.date_utils import convert_date_string
-from app.utils.db_decorator import with_db_session
+from app.utils.db_decorator import with_async_db_session
+
+# Поля тренировки, от которых зависят агрегаты статистики (workout_stats)
+STATS_FIELDS = frozenset({"type", "duration", "planned_date"})
+
+# Колонки workout в порядке полей WorkoutRow: строка результата собирается позиционно
+WORKOUT_ROW_COLUMNS = tuple(Workout.__table__.c[field.name] for field in fields(WorkoutRow))
+
+# FTS5-таблица полнотекстового поиска на SQLite (миграция 0011), rowid = workout.id
+WORKOUT_FTS = table("workout_fts", column("rowid"))
 
 
 class WorkoutRepository:
@@ -20,13 +53,20 @@ class WorkoutRepository:
         min_duration: int | None = None,
         max_duration: int | None = None,
         page: int = 1,
-        size: int = 10,
+        size: int | None = 10,
+        after_id: int | None = None,
     ):
         """
-        Применяет фильтры к SQLAlchemy query объекту.
+        Применяет фильтры к SQLAlchemy select() объекту.
+
+        Удаленные тренировки (надгробия) исключаются. Тренировки сортируются по id. Если передан after_id, страница выбирается
+        keyset-условием id > after_id (стоимость не зависит от глубины страницы),
+        иначе — через offset по номеру страницы (режим совместимости). Лимит на один
+        элемент больше size: по лишней строке вызывающий узнает, есть ли следующая страница.
+        С size=None пагинация не применяется (выгрузка всех подходящих тренировок).
 
         Args:
-            query: SQLAlchemy query объект
+            query: SQLAlchemy select() объект
             user_id: ID пользователя
             type: Тип тренировки
             date_from: Начальная дата (включительно)
@@ -34,12 +74,15 @@ class WorkoutRepository:
             min_duration: Минимальная длительность
             max_duration: Максимальная длительность
             page: Номер страницы
-            size: Количество элементов на странице
+            size: Количество элементов на странице (None — без пагинации)
+            after_id: ID последней тренировки предыдущей страницы (keyset-пагинация)
 
         Returns:
-            Отфильтрованный query объект с примененной пагинацией
+            Отфильтрованный select() объект с примененной пагинацией
         """
         # Применяем фильтры на уровне SQL запроса
+        query = query.filter(Workout.deleted_at.is_(None))
+
         if user_id is not None:
             query = query.filter(Workout.user_id == user_id)
 
@@ -58,26 +101,35 @@ class WorkoutRepository:
         if max_duration is not None:
             query = query.filter(Workout.duration <= max_duration)
 
-        # Применяем пагинацию на уровне SQL
-        offset = (page - 1) * size
-        query = query.offset(offset).limit(size)
+        # Применяем пагинацию на уровне SQL с детерминированным порядком
+        query = query.order_by(Workout.id)
+        if size is None:
+            return query
+        if after_id is not None:
+            query = query.filter(Workout.id > after_id)
+        else:
+            query = query.offset((page - 1) * size)
+        query = query.limit(size + 1)
 
         return query
 
-    @with_db_session()
-    def create(self, db: Session, workout_data: Workout) -> Workout:
+    @with_async_db_session()
+    async def create(self, db: AsyncSession, workout_data: Workout) -> Workout:
         """Создать новую тренировку"""
-        # Исключаем id при создании, чтобы БД сама сгенерировала новый ID
-        workout_dict = workout_data.model_dump(exclude={"id"})
+        # Исключаем служебные поля при создании: их назначают БД и репозиторий
+        workout_dict = workout_data.model_dump(exclude=WORKOUT_SERVER_FIELDS - {"user_id"})
 
         # Преобразуем строку даты в объект date (пустая строка → None)
         if "planned_date" in workout_dict:
             workout_dict["planned_date"] = convert_date_string(workout_dict["planned_date"])
 
-        workout = Workout(**workout_dict)
+        change_seq = await self._touch_user_workouts(db, workout_dict.get("user_id"))
+        workout = Workout(**workout_dict, updated_at=datetime.now(), change_seq=change_seq)
         db.add(workout)
-        db.flush()  # Отправляем изменения в БД без коммита (коммит будет в декораторе)
-        db.refresh(
+        # Агрегаты статистики обновляются в той же транзакции
+        await stats_repository.apply_workout_changes(db, added=[workout])
+        await db.flush()  # Отправляем изменения в БД без коммита (коммит будет в декораторе)
+        await db.refresh(
             workout
         )  # Обновляем объект из БД (получаем сгенерированный ID и другие значения)
 
@@ -85,10 +137,36 @@ class WorkoutRepository:
         db.expunge(workout)
         return workout
 
-    @with_db_session(expunge_all=True)
-    def get_all(
+    @with_async_db_session()
+    async def create_many(
+        self, db: AsyncSession, user_id: int, rows: list[WorkoutImportRow]
+    ) -> int:
+        """
+        Создать пачку тренировок пользователя одним Core INSERT с executemany (без refresh).
+
+        Запрос компилируется и подготавливается один раз на пачку, а строки передаются
+        драйверу списком параметров: это быстрее многострочного INSERT ... VALUES, который
+        пришлось бы заново компилировать для каждой пачки.
+
+        Returns:
+            Количество созданных тренировок
+        """
+        if not rows:
+            return 0
+        change_seq = await self._touch_user_workouts(db, user_id)
+        server_values = {"user_id": user_id, "updated_at": datetime.now(), "change_seq": change_seq}
+        # Core INSERT по таблице: без ORM bulk-вставки, которая разбирает каждую строку
+        await db.execute(
+            insert(Workout.__table__), [{**row.model_dump(), **server_values} for row in rows]
+        )
+        # Агрегаты статистики обновляются в той же транзакции, одним upsert на пачку
+        await stats_repository.apply_workout_changes(db, added=rows)
+        return len(rows)
+
+    @with_async_db_session()
+    async def get_all(
         self,
-        db: Session,
+        db: AsyncSession,
         user_id: int = None,
         type: GymType | None = None,
         date_from: date | None = None,
@@ -97,11 +175,19 @@ class WorkoutRepository:
         max_duration: int | None = None,
         page: int = 1,
         size: int = 10,
-    ) -> list[Workout]:
-        """Получить все тренировки с фильтрацией на уровне SQL"""
-        query = db.query(Workout)
+        after_id: int | None = None,
+    ) -> tuple[list[WorkoutRow], bool]:
+        """
+        Получить страницу тренировок с фильтрацией на уровне SQL.
+
+        Тренировки читаются Core-запросом в WorkoutRow: без ORM-объектов, identity map
+        и отсоединения от сессии — строки сразу уходят в сериализацию ответа.
+
+        Returns:
+            Тренировки страницы и признак наличия следующей страницы
+        """
         query = self._filter_workouts(
-            query,
+            select(*WORKOUT_ROW_COLUMNS),
             user_id=user_id,
             type=type,
             date_from=date_from,
@@ -110,50 +196,347 @@ class WorkoutRepository:
             max_duration=max_duration,
             page=page,
             size=size,
+            after_id=after_id,
+        )
+        result = await db.execute(query)
+        workouts = [WorkoutRow(*row) for row in result]
+        return workouts[:size], len(workouts) > size
+
+    async def stream_all(
+        self,
+        user_id: int,
+        type: GymType | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        min_duration: int | None = None,
+        max_duration: int | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Потоково выбрать все подходящие тренировки пользователя пачками по batch_size.
+
+        Строки читаются курсором (yield_per) без ORM-объектов, в памяти находится не
+        больше одной пачки. Метод открывает собственную сессию, а не сессию HTTP-запроса:
+        генератор дочитывается при отправке тела ответа, когда сессия запроса уже закрыта.
+
+        Yields:
+            Пачки строк таблицы workout, отсортированные по id
+        """
+        query = self._filter_workouts(
+            select(*Workout.__table__.columns),
+            user_id=user_id,
+            type=type,
+            date_from=date_from,
+            date_to=date_to,
+            min_duration=min_duration,
+            max_duration=max_duration,
+            size=None,
+        ).execution_options(yield_per=batch_size)
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query)
+            async for partition in result.partitions():
+                yield partition
+
+    @with_async_db_session()
+    async def get_changes(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        after: tuple[int, int] | None = None,
+        limit: int = 100,
+    ) -> tuple[list[WorkoutRow], bool]:
+        """
+        Получить изменения тренировок пользователя после позиции (change_seq, id).
+
+        Изменения выбираются по индексу (user_id, change_seq, id), поэтому стоимость
+        зависит от числа изменений после позиции, а не от размера истории. В результат
+        входят и надгробия удаленных тренировок. Без позиции (первая синхронизация)
+        возвращаются только неудаленные тренировки: клиенту нечего удалять.
+
+        Returns:
+            Изменения в порядке (change_seq, id) и признак того, что есть еще
+        """
+        query = select(*WORKOUT_ROW_COLUMNS).where(Workout.user_id == user_id)
+        if after is None:
+            query = query.where(Workout.deleted_at.is_(None))
+        else:
+            query = query.where(tuple_(Workout.change_seq, Workout.id) > tuple_(*after))
+        query = query.order_by(Workout.change_seq, Workout.id).limit(limit + 1)
+        result = await db.execute(query)
+        workouts = [WorkoutRow(*row) for row in result]
+        return workouts[:limit], len(workouts) > limit
+
+    @with_async_db_session()
+    async def search(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        terms: list[str],
+        after: tuple[float, int] | None = None,
+        limit: int = 20,
+    ) -> tuple[list[WorkoutRow], float | None, bool]:
+        """
+        Полнотекстовый поиск по заметкам и упражнениям тренировок пользователя.
+
+        Ищутся тренировки, в которых есть слова, начинающиеся с каждого из terms.
+        На SQLite запрос идет в FTS5-таблицу workout_fts (релевантность — bm25), на
+        PostgreSQL — в GIN-индекс по вычисляемому tsvector (ts_rank); оба индекса
+        поддерживаются миграцией 0011.
+
+        Результаты упорядочены по убыванию релевантности, затем по id; after — позиция
+        (rank, id) последней тренировки предыдущей страницы.
+
+        Returns:
+            Тренировки страницы, релевантность последней из них и признак наличия
+            следующей страницы
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            search_vector = literal_column("workout.search_vector")
+            ts_query = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+            rank = func.ts_rank(search_vector, ts_query)
+            query = select(*WORKOUT_ROW_COLUMNS, rank).where(
+                Workout.user_id == user_id, search_vector.op("@@")(ts_query)
+            )
+        else:
+            # Имя FTS5-таблицы как аргумент MATCH и bm25()
+            fts = literal_column(WORKOUT_FTS.name)
+            # Поиск только в колонках notes и exercises среди строк с токеном владельца
+            words = " ".join(f'"{term}"*' for term in terms)
+            match = f"user_key : u{user_id} AND {{notes exercises}} : ({words})"
+            # bm25 тем меньше, чем релевантнее; колонка user_key в оценке не участвует
+            rank = -func.bm25(fts, 0.0, 1.0, 1.0)
+            query = (
+                select(*WORKOUT_ROW_COLUMNS, rank)
+                .select_from(WORKOUT_FTS.join(Workout.__table__, Workout.id == WORKOUT_FTS.c.rowid))
+                .where(fts.op("MATCH")(match))
+            )
+
+        query = query.where(Workout.deleted_at.is_(None))
+        if after is not None:
+            after_rank, after_id = after
+            query = query.where(
+                or_(rank < after_rank, and_(rank == after_rank, Workout.id > after_id))
+            )
+        query = query.order_by(rank.desc(), Workout.id).limit(limit + 1)
+
+        result = (await db.execute(query)).all()
+        workouts = [WorkoutRow(*row[:-1]) for row in result[:limit]]
+        last_rank = result[len(workouts) - 1][-1] if workouts else None
+        return workouts, last_rank, len(result) > limit
+
+    @with_async_db_session()
+    async def get_by_id(self, db: AsyncSession, workout_id: int) -> Workout | None:
+        """Получить неудаленную тренировку по ID"""
+        result = await db.execute(
+            select(Workout).where(Workout.id == workout_id, Workout.deleted_at.is_(None))
         )
-        workouts = query.all()
-        # expunge_all вызывается автоматически декоратором
-        return workouts
-
-    @with_db_session()
-    def get_by_id(self, db: Session, workout_id: int) -> Workout | None:
-        """Получить тренировку по ID"""
-        workout = db.query(Workout).filter(Workout.id == workout_id).first()
+        workout = result.scalar_one_or_none()
         if workout:
             db.expunge(workout)
         return workout
 
-    @with_db_session()
-    def update(self, db: Session, workout_id: int, workout_data: Workout) -> Workout | None:
-        """Обновить тренировку"""
-        workout = db.query(Workout).filter(Workout.id == workout_id).first()
-        if workout:
-            # Исключаем id при обновлении, чтобы не менять ID записи
-            workout_dict = workout_data.model_dump(exclude={"id"})
+    @with_async_db_session()
+    async def get_owner_id(self, db: AsyncSession, workout_id: int) -> int | None:
+        """
+        Получить ID владельца тренировки (None, если тренировки нет или она удалена).
 
-            # Преобразуем строку даты в объект date (пустая строка → None)
-            if "planned_date" in workout_dict:
-                workout_dict["planned_date"] = convert_date_string(workout_dict["planned_date"])
+        Нужен только после неудачной записи, чтобы отличить 404 от 403.
+        """
+        result = await db.execute(
+            select(Workout.user_id).where(Workout.id == workout_id, Workout.deleted_at.is_(None))
+        )
+        return result.scalar_one_or_none()
 
-            # Обновляем поля объекта
-            for key, value in workout_dict.items():
-                setattr(workout, key, value)
+    @with_async_db_session()
+    async def get_owner_and_version(
+        self, db: AsyncSession, workout_id: int
+    ) -> tuple[int | None, int] | None:
+        """
+        Получить владельца и версию тренировки без загрузки остальных колонок.
 
-            db.flush()  # Отправляем изменения в БД без коммита (коммит будет в декораторе)
-            db.refresh(workout)
-            # Отсоединяем объект от сессии перед возвратом, чтобы он был доступен после закрытия сессии
-            db.expunge(workout)
-            return workout
-        return None
+        Returns:
+            (user_id, version) или None, если тренировки нет или она удалена
+        """
+        statement = select(Workout.user_id, Workout.version).where(
+            Workout.id == workout_id, Workout.deleted_at.is_(None)
+        )
+        row = (await db.execute(statement)).first()
+        return tuple(row) if row is not None else None
 
-    @with_db_session()
-    def delete(self, db: Session, workout_id: int) -> bool:
-        """Удалить тренировку"""
-        workout = db.query(Workout).filter(Workout.id == workout_id).first()
-        if workout:
-            db.delete(workout)
-            return True
-        return False
+    @with_async_db_session()
+    async def update(
+        self,
+        db: AsyncSession,
+        workout_id: int,
+        user_id: int,
+        values: dict,
+        expected_versions: list[int] | None = None,
+    ) -> Workout | None:
+        """
+        Обновить поля тренировки пользователя одним UPDATE ... WHERE id AND user_id RETURNING.
+
+        Меняются только переданные в values поля, версия увеличивается на 1, updated_at и
+        change_seq обновляются. Удаленные тренировки не обновляются. С
+        expected_versions строка обновляется, только если ее текущая версия среди них
+        (оптимистичная блокировка), без предварительного чтения.
+
+        Значения до изменения нужны для агрегатов статистики, только если меняются тип,
+        длительность или дата: на PostgreSQL они возвращаются тем же запросом (UPDATE ...
+        FROM с блокировкой строки), на SQLite, где RETURNING не видит таблицы из FROM,
+        читаются отдельным запросом в той же транзакции.
+
+        Returns:
+            Обновленная тренировка или None, если тренировки нет, она удалена, чужая или
+            ее версия не совпала с ожидаемой
+        """
+        values = dict(values)
+        # Преобразуем строку даты в объект date (пустая строка → None)
+        if "planned_date" in values:
+            values["planned_date"] = convert_date_string(values["planned_date"])
+
+        table = Workout.__table__
+        owned = (
+            (table.c.id == workout_id) & (table.c.user_id == user_id) & table.c.deleted_at.is_(None)
+        )
+        if expected_versions is not None:
+            owned &= table.c.version.in_(expected_versions)
+        change_seq = await self._touch_user_workouts(db, user_id)
+        statement = (
+            update(table)
+            .values(
+                **values,
+                version=table.c.version + 1,
+                updated_at=datetime.now(),
+                change_seq=change_seq,
+            )
+            .returning(*table.columns)
+        )
+
+        if not values.keys() & STATS_FIELDS:
+            row = (await db.execute(statement.where(owned))).first()
+            if row is None:
+                await self._revert_user_workouts_touch(db, user_id)
+                return None
+            return self._workout_from_row(row)
+
+        if db.get_bind().dialect.name == "postgresql":
+            previous_row = (
+                select(table.c.id, table.c.type, table.c.duration, table.c.planned_date)
+                .where(owned)
+                .with_for_update()
+                .subquery("previous")
+            )
+            statement = statement.where(table.c.id == previous_row.c.id).returning(
+                previous_row.c.type.label("previous_type"),
+                previous_row.c.duration.label("previous_duration"),
+                previous_row.c.planned_date.label("previous_planned_date"),
+            )
+            row = (await db.execute(statement)).first()
+            if row is None:
+                await self._revert_user_workouts_touch(db, user_id)
+                return None
+            previous = Workout(
+                type=row.previous_type,
+                duration=row.previous_duration,
+                planned_date=row.previous_planned_date,
+            )
+        else:
+            previous_query = select(Workout.type, Workout.duration, Workout.planned_date)
+            previous_row = (await db.execute(previous_query.where(owned))).first()
+            if previous_row is None:
+                await self._revert_user_workouts_touch(db, user_id)
+                return None
+            row = (await db.execute(statement.where(owned))).first()
+            previous = Workout(**previous_row._mapping)
+
+        workout = self._workout_from_row(row)
+        await stats_repository.apply_workout_changes(db, removed=[previous], added=[workout])
+        return workout
+
+    @staticmethod
+    def _workout_from_row(row: Row) -> Workout:
+        """Собрать Workout из строки RETURNING со всеми колонками таблицы"""
+        return Workout(
+            **{column.name: row._mapping[column] for column in Workout.__table__.columns}
+        )
+
+    @with_async_db_session()
+    async def delete(self, db: AsyncSession, workout_id: int, user_id: int) -> bool:
+        """
+        Мягко удалить тренировку пользователя одним UPDATE ... WHERE id AND user_id RETURNING.
+
+        Строка остается надгробием с deleted_at (для GET /workouts/changes), ее версия
+        растет, а из агрегатов статистики тренировка вычитается.
+
+        Returns:
+            False, если тренировки нет, она уже удалена или чужая
+        """
+        table = Workout.__table__
+        change_seq = await self._touch_user_workouts(db, user_id)
+        now = datetime.now()
+        statement = (
+            update(table)
+            .where(
+                table.c.id == workout_id,
+                table.c.user_id == user_id,
+                table.c.deleted_at.is_(None),
+            )
+            .values(
+                version=table.c.version + 1,
+                updated_at=now,
+                deleted_at=now,
+                change_seq=change_seq,
+            )
+            .returning(table.c.type, table.c.duration, table.c.planned_date)
+        )
+        removed = (await db.execute(statement)).first()
+        if removed is None:
+            await self._revert_user_workouts_touch(db, user_id)
+            return False
+        await stats_repository.apply_workout_changes(db, removed=[removed])
+        return True
+
+    async def _touch_user_workouts(self, db: AsyncSession, user_id: int | None) -> int:
+        """
+        Увеличить счетчик изменений тренировок пользователя и вернуть новое значение.
+
+        Счетчик служит ETag списка GET /workouts и номером изменения (change_seq) для
+        GET /workouts/changes. Он увеличивается первым запросом транзакции изменения:
+        блокировка строки user упорядочивает параллельные изменения одного пользователя,
+        поэтому номера фиксируются по возрастанию и курсор синхронизации не пропускает
+        изменений. Если запись затем не затронула строк, счетчик возвращается назад
+        (_revert_user_workouts_touch).
+        """
+        if user_id is None:
+            return 0
+        result = await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(workouts_version=User.workouts_version + 1)
+            .returning(User.workouts_version)
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def _revert_user_workouts_touch(self, db: AsyncSession, user_id: int) -> None:
+        """
+        Вернуть счетчик изменений назад, если изменение не затронуло строк (тренировки
+        нет, она чужая или версия не совпала).
+
+        Иначе неудачная запись (403/404/412) меняла бы ETag списка у всех клиентов и
+        сжигала номер change_seq. Строка user заблокирована этой транзакцией с момента
+        _touch_user_workouts, поэтому номер не успел занять никто другой.
+        """
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(workouts_version=User.workouts_version - 1)
+        )
+
+    @with_async_db_session()
+    async def get_user_workouts_version(self, db: AsyncSession, user_id: int) -> int:
+        """Счетчик изменений тренировок пользователя (поиск по первичному ключу user)"""
+        result = await db.execute(select(User.workouts_version).where(User.id == user_id))
+        return result.scalar_one_or_none() or 0
 
 
 # Глобальный экземпляр репозитория (в будущем будет заменен на работу с БД)
@@ -1,20 +1,47 @@
+import secrets
 from datetime import datetime, timedelta
 
 import jwt
 
 from app.core.config import settings
+from app.models.jwt_tokens import TokenType
+from app.models.user import UserRole
 
 
-def create_jwt_token(user_id: int, expire_minutes: int) -> str:
+def get_token_type_claim(token_type: TokenType) -> str:
+    """Значение claim typ для типа токена: access или refresh"""
+    return token_type.removesuffix("_token")
+
+
+def create_jwt_token(
+    user_id: int,
+    expire_minutes: int,
+    token_generation: int = 0,
+    role: UserRole | None = None,
+    token_type: TokenType = "access_token",
+) -> str:
     """
     Создает JWT токен для пользователя
 
     Args:
         user_id: ID пользователя
+        token_generation: Поколение токенов пользователя (claim gen). Токены старых
+            поколений отклоняются после "выхода со всех устройств"
+        role: Роль пользователя (claim role): позволяет проверять права без запроса к БД
+        token_type: Тип токена (claim typ): Refresh токен не принимается как Access и наоборот
 
     Returns:
         JWT токен в виде строки
     """
     expire = datetime.utcnow() + timedelta(minutes=expire_minutes)
-    payload = {"user_id": user_id, "exp": expire}
+    # jti делает токены уникальными, даже если они выпущены в одну секунду
+    payload = {
+        "user_id": user_id,
+        "exp": expire,
+        "jti": secrets.token_hex(8),
+        "gen": token_generation,
+        "typ": get_token_type_claim(token_type),
+    }
+    if role is not None:
+        payload["role"] = UserRole(role).value
     return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
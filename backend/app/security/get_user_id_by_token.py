@@ -3,22 +3,68 @@ from fastapi import HTTPException, status
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 
 from app.core.config import settings
+from app.models.jwt_tokens import TokenType
+from app.models.user import Principal, UserRole
+from app.security.create_jwt_token import get_token_type_claim
 
 
-def get_user_id_by_token(token: str) -> int:
-    """Получение ID пользователя по JWT-токену"""
+def get_token_payload(token: str, verify_exp: bool = True) -> dict:
+    """
+    Декодирование JWT-токена с проверкой подписи и (по умолчанию) срока действия
+
+    Args:
+        token: JWT-токен
+        verify_exp: Проверять ли срок действия (exp)
+
+    Returns:
+        Payload токена
+    """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id = payload.get("user_id")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Невалидный токен: отсутствует user_id",
-            )
-        return user_id
+        return jwt.decode(
+            token,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM],
+            options={"verify_exp": verify_exp},
+        )
     except ExpiredSignatureError as err:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Токен истек") from err
     except InvalidTokenError as err:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Невалидный токен"
         ) from err
+
+
+def check_token_type(payload: dict, token_type: TokenType) -> bool:
+    """
+    Проверка claim typ: Access и Refresh токены подписаны одним ключом и несут одни и те
+    же claims, поэтому без нее Refresh токен проходил бы как Access. Токены без typ
+    (выпущенные до его появления) не принимаются.
+    """
+    return payload.get("typ") == get_token_type_claim(token_type)
+
+
+def get_principal_by_token(token: str, token_type: TokenType = "access_token") -> Principal:
+    """Получение пользователя (ID, роль, поколение токенов) из claims JWT-токена без БД"""
+    payload = get_token_payload(token)
+    if not check_token_type(payload, token_type):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Невалидный токен: неверный тип токена",
+        )
+    user_id = payload.get("user_id")
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Невалидный токен: отсутствует user_id",
+        )
+    role = payload.get("role")
+    return Principal(
+        id=user_id,
+        role=UserRole(role) if role is not None else None,
+        token_generation=payload.get("gen", 0),
+    )
+
+
+def get_user_id_by_token(token: str) -> int:
+    """Получение ID пользователя по JWT-токену"""
+    return get_principal_by_token(token).id
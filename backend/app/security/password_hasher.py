@@ -0,0 +1,82 @@
+# Хеширование и проверка паролей в отдельном пуле воркеров
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.security.password import hash_password, verify_password
+
+
+class PasswordHasher:
+    """
+    Выполняет bcrypt (hash_password/verify_password) в пуле потоков или процессов.
+
+    bcrypt занимает 100–300 мс CPU: вызванный прямо в async-роутере, он блокирует
+    event loop для всех запросов воркера. Пул ограничен PASSWORD_HASH_WORKERS
+    воркерами, а число ожидающих операций — PASSWORD_HASH_MAX_QUEUE: при переполнении
+    запрос сразу получает 503, а не ждет в очереди до таймаута клиента.
+    """
+
+    def __init__(self):
+        self._executor: Executor | None = None
+        self._in_flight = 0  # Операции в работе и в очереди (счетчик event loop, без локов)
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        """Получить пул воркеров (создается при первом использовании)"""
+        if self._executor is None:
+            if settings.PASSWORD_HASH_EXECUTOR == "process":
+                self._executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    thread_name_prefix="password-hasher",
+                )
+        return self._executor
+
+    async def _run[T](self, func: Callable[..., T], *args) -> T:
+        """Выполнить функцию в пуле с ограничением числа ожидающих операций"""
+        if self._in_flight >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Сервер перегружен, повторите попытку позже",
+                headers={"Retry-After": "1"},
+            )
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._in_flight -= 1
+
+    async def hash_password(self, password: str) -> str:
+        """Хешировать пароль (bcrypt) вне event loop"""
+        return await self._run(hash_password, password)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Проверить пароль (bcrypt) вне event loop"""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        """Статистика пула для мониторинга"""
+        return {
+            "executor": settings.PASSWORD_HASH_EXECUTOR,
+            "workers": settings.PASSWORD_HASH_WORKERS,
+            "max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+            "in_flight": self._in_flight,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        """Остановить пул воркеров (вызывается из lifespan)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Глобальный экземпляр пула хеширования паролей
+password_hasher = PasswordHasher()
@@ -0,0 +1,84 @@
+# Денайлист отозванных Access токенов для stateless-режима (ACCESS_TOKEN_STATELESS=true)
+import asyncio
+import contextlib
+import logging
+from datetime import datetime
+
+from app.repositories.jwt_tokens_repository import jwt_tokens_repository
+
+logger = logging.getLogger(__name__)
+
+
+class AccessTokenDenylist:
+    """
+    In-memory денайлист отозванных Access токенов.
+
+    В stateless-режиме Access токены не сохраняются и проверяются только по подписи и exp,
+    поэтому отдельно хранятся лишь отозванные (logout) токены: хеш → срок действия.
+    Записи удаляются, как только токен истёк сам. Источник истины — Redis/БД:
+    фоновая задача периодически подтягивает оттуда отзывы, сделанные другими воркерами.
+    """
+
+    def __init__(self):
+        self._revoked: dict[str, datetime] = {}
+        self._sync_task: asyncio.Task | None = None
+
+    def add(self, token_hash: str, expires_at: datetime) -> None:
+        """Добавить токен в денайлист до момента его истечения"""
+        if expires_at > datetime.now():
+            self._revoked[token_hash] = expires_at
+
+    def contains(self, token_hash: str) -> bool:
+        """Проверить, отозван ли токен (без обращений к Redis/БД)"""
+        expires_at = self._revoked.get(token_hash)
+        if expires_at is None:
+            return False
+        if expires_at <= datetime.now():
+            # Истекший токен отклоняется проверкой exp, хранить его больше не нужно
+            del self._revoked[token_hash]
+            return False
+        return True
+
+    def prune(self) -> None:
+        """Удалить записи об уже истекших токенах"""
+        now = datetime.now()
+        self._revoked = {
+            token_hash: expires_at
+            for token_hash, expires_at in self._revoked.items()
+            if expires_at > now
+        }
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    async def sync(self) -> None:
+        """Подтянуть отозванные токены из Redis/БД и удалить истекшие"""
+        revoked = await jwt_tokens_repository.get_revoked_access_tokens()
+        self._revoked.update(revoked)
+        self.prune()
+
+    async def _sync_loop(self, interval_seconds: float) -> None:
+        """Периодическая синхронизация денайлиста"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Не удалось синхронизировать денайлист Access токенов")
+
+    async def start(self, interval_seconds: float) -> None:
+        """Загрузить денайлист и запустить фоновую синхронизацию (вызывается из lifespan)"""
+        await self.sync()
+        self._sync_task = asyncio.create_task(self._sync_loop(interval_seconds))
+
+    async def stop(self) -> None:
+        """Остановить фоновую синхронизацию"""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sync_task
+            self._sync_task = None
+
+
+# Глобальный экземпляр денайлиста
+access_token_denylist = AccessTokenDenylist()
@@ -1,16 +1,18 @@
 # Сервис для аутентификации и авторизации
 from app.core.config import settings
+from app.core.database import release_db_connection
 from app.models.user import User, UserRole
 from app.repositories.auth_repository import auth_repository
+from app.repositories.user_repository import user_repository
 from app.security.create_jwt_token import create_jwt_token
-from app.security.password import hash_password
+from app.security.password_hasher import password_hasher
 from app.services.jwt_tokens_service import jwt_tokens_service
 
 
 class AuthService:
     """Сервис для бизнес-логики аутентификации"""
 
-    def register(self, user_data: User) -> User:
+    async def register(self, user_data: User) -> User:
         """Зарегистрировать нового пользователя"""
         # Если username и password соответствуют настройкам админа, выдаём админские права
         if (
@@ -19,24 +21,42 @@ class AuthService:
         ):
             user_data.role = UserRole.ADMIN
 
-        # Хешируем пароль перед сохранением
-        user_data.password = hash_password(user_data.password)
-        return auth_repository.register(user_data)
+        # Хешируем пароль перед сохранением (в пуле воркеров, до обращений к БД)
+        user_data.password = await password_hasher.hash_password(user_data.password)
+        return await auth_repository.register(user_data)
 
     async def login(self, username: str, password: str) -> tuple[str, str] | None:
         """Вход в систему"""
-        # Получаем пользователя по username и проверяем пароль
-        user: User | None = auth_repository.login(username, password)
+        # Получаем пользователя по username
+        user: User | None = await user_repository.get_user_by_username(username)
+        if user is None:
+            return None
+
+        # Возвращаем соединение в пул: проверка bcrypt долгая и БД не нужна
+        await release_db_connection()
+
+        # Проверяем пароль в пуле воркеров, не блокируя event loop
+        if not await password_hasher.verify_password(password, user.password):
+            return None
+
+        # Токены выпускаются в текущем поколении токенов пользователя
+        token_generation = await jwt_tokens_service.get_token_generation(user.id)
 
         # Генерируем Refresh токен
-        refresh_token = create_jwt_token(user.id, settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+        refresh_token = create_jwt_token(
+            user.id,
+            settings.REFRESH_TOKEN_EXPIRE_MINUTES,
+            token_generation,
+            user.role,
+            "refresh_token",
+        )
 
         # Сохраняем Refresh токен в БД
-        jwt_tokens_service.create_refresh_token(user.id, refresh_token)
+        await jwt_tokens_service.create_refresh_token(user.id, refresh_token)
 
         # Генерируем Access токен
-        access_token = await jwt_tokens_service.get_access_token_by_refresh_token(
-            user.id, refresh_token
+        access_token = await jwt_tokens_service.create_access_token(
+            user.id, token_generation, user.role
         )
 
         return access_token, refresh_token
@@ -1,91 +1,250 @@
 # Сервис для бизнес-логики JWT токенов
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
 
 from app.core.config import settings
-from app.models.jwt_tokens import JWTToken, TokenType
+from app.models.jwt_tokens import CachedAccessToken, JWTToken, TokenType
+from app.models.user import Principal, UserRole
 from app.repositories.jwt_tokens_repository import jwt_tokens_repository
+from app.repositories.user_repository import user_repository
 from app.security.create_jwt_token import create_jwt_token
+from app.security.get_user_id_by_token import (
+    check_token_type,
+    get_principal_by_token,
+    get_token_payload,
+)
+from app.security.token import hash_token
+from app.services.access_token_denylist import access_token_denylist
+from app.utils.ttl_cache import TTLCache
 
 
 class JWTTokensService:
     """Сервис для бизнес-логики JWT токенов"""
 
-    def create_refresh_token(self, user_id: int, token: str) -> JWTToken:
+    def __init__(self):
+        # Кэш проверенных Access токенов: ключ — хеш токена
+        self.access_token_cache = TTLCache[str, CachedAccessToken](
+            maxsize=settings.ACCESS_TOKEN_CACHE_SIZE,
+            ttl=settings.ACCESS_TOKEN_CACHE_TTL_SECONDS,
+        )
+        # Кэш поколений токенов: ключ — ID пользователя. Увеличение поколения в другом
+        # воркере становится видно здесь не позже чем через TOKEN_GENERATION_CACHE_TTL_SECONDS
+        self.token_generation_cache = TTLCache[int, int](
+            maxsize=settings.ACCESS_TOKEN_CACHE_SIZE,
+            ttl=settings.TOKEN_GENERATION_CACHE_TTL_SECONDS,
+        )
+
+    async def create_refresh_token(self, user_id: int, token: str) -> JWTToken:
         """Создание refresh токена"""
-        return jwt_tokens_repository.create_refresh_token(user_id, token)
+        return await jwt_tokens_repository.create_refresh_token(user_id, token)
 
-    def _check_token_exists(self, token: str, token_type: TokenType) -> bool:
+    async def _check_token_exists(self, token: str, token_type: TokenType) -> bool:
         """Универсальная проверка наличия токена в БД"""
-        jwt_token = jwt_tokens_repository.get_token_by_hash(token, token_type)
+        jwt_token = await jwt_tokens_repository.get_token_by_hash(token, token_type)
         return jwt_token is not None
 
-    def _check_token_expired(self, token: str, token_type: TokenType) -> bool:
-        """Универсальная проверка того не истёк ли токен и не инвалидирован ли он"""
+    async def _get_valid_token(self, token: str, token_type: TokenType) -> JWTToken | None:
+        """Универсальное получение токена, если он не истёк и не инвалидирован"""
         # Получаем сам токен из БД
-        jwt_token: JWTToken | None = jwt_tokens_repository.get_token_by_hash(token, token_type)
+        jwt_token: JWTToken | None = await jwt_tokens_repository.get_token_by_hash(
+            token, token_type
+        )
 
-        # Если токен не найден, то возвращаем True (считаем истекшим)
+        # Если токен не найден, то считаем его истекшим
         if not jwt_token:
-            return True
+            return None
 
         # Проверяем не истёк ли токен
         is_expired = jwt_token.expires_at < datetime.now()
 
         # Если истёк, то инвалидируем токен
         if is_expired:
-            self._invalidate_token(token, token_type)
+            await self._invalidate_token(token, token_type)
 
-        # Проверяем не инвалидирован ли токен
-        is_revoked = jwt_token.revoked
+        # Возвращаем None, если токен истёк или инвалидирован
+        if is_expired or jwt_token.revoked:
+            return None
+        return jwt_token
 
-        # Возвращаем True, если токен истёк или инвалидирован
-        return is_expired or is_revoked
+    async def _check_token_expired(self, token: str, token_type: TokenType) -> bool:
+        """Универсальная проверка того не истёк ли токен и не инвалидирован ли он"""
+        return await self._get_valid_token(token, token_type) is None
 
-    def _invalidate_token(self, token: str, token_type: TokenType) -> bool:
+    async def _invalidate_token(self, token: str, token_type: TokenType) -> bool:
         """Универсальная инвалидация токена"""
-        return jwt_tokens_repository.update_token_revoked(token, token_type, revoked=True)
+        return await jwt_tokens_repository.update_token_revoked(token, token_type, revoked=True)
 
-    def check_refresh_token_exists(self, token: str) -> bool:
+    async def check_refresh_token_exists(self, token: str) -> bool:
         """Проверка наличия Refresh токена в БД"""
-        return self._check_token_exists(token, "refresh_token")
+        return await self._check_token_exists(token, "refresh_token")
 
-    def check_refresh_token_expired(self, token: str) -> bool:
+    async def check_refresh_token_expired(self, token: str) -> bool:
         """Проверка того не истёк ли Refresh токен и не инвалидирован ли он"""
-        return self._check_token_expired(token, "refresh_token")
+        return await self._check_token_expired(token, "refresh_token")
 
-    def invalidate_refresh_token(self, token: str) -> bool:
+    async def invalidate_refresh_token(self, token: str) -> bool:
         """Инвалидация Refresh токена"""
-        return self._invalidate_token(token, "refresh_token")
-
-    async def get_access_token_by_refresh_token(self, user_id: int, token: str) -> str | dict:
-        """Получение Access токена по Refresh токену"""
-        # Проверяем наличие Refresh токена в БД
-        if not self.check_refresh_token_exists(token):
-            return {"error": "Refresh токен не найден"}
-
-        # Проверяем не истёк ли Refresh токен
-        if self.check_refresh_token_expired(token):
-            return {"error": "Refresh токен истёк"}
-
-        # Генерируем Access токен
-        access_token = create_jwt_token(user_id, settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-
-        # Сохраняем Access токен в Redis
-        jwt_tokens_repository.create_access_token(user_id, access_token)
+        return await self._invalidate_token(token, "refresh_token")
+
+    async def get_token_generation(self, user_id: int) -> int:
+        """Получение текущего поколения токенов пользователя (через кэш)"""
+        token_generation = self.token_generation_cache.get(user_id)
+        if token_generation is None:
+            token_generation = await jwt_tokens_repository.get_token_generation(user_id)
+            self.token_generation_cache.set(user_id, token_generation)
+        return token_generation
+
+    async def check_token_generation(self, user_id: int, token_generation: int) -> bool:
+        """Проверка того, что токен выпущен в текущем поколении токенов пользователя"""
+        return token_generation == await self.get_token_generation(user_id)
+
+    async def revoke_all_user_tokens(self, user_id: int) -> int:
+        """
+        Отзыв всех токенов пользователя ("выход со всех устройств").
+
+        Одна запись: поколение токенов увеличивается, и токены с прежним поколением
+        в claim gen перестают приниматься. Возвращает новое поколение.
+        """
+        token_generation = await jwt_tokens_repository.increment_token_generation(user_id)
+        self.token_generation_cache.set(user_id, token_generation)
+        return token_generation
+
+    async def create_access_token(
+        self, user_id: int, token_generation: int, role: UserRole | None
+    ) -> str:
+        """Выпуск нового Access токена"""
+        access_token = create_jwt_token(
+            user_id, settings.ACCESS_TOKEN_EXPIRE_MINUTES, token_generation, role
+        )
+
+        # Сохраняем Access токен в Redis (в stateless-режиме он проверяется по подписи и exp)
+        if not settings.ACCESS_TOKEN_STATELESS:
+            await jwt_tokens_repository.create_access_token(user_id, access_token)
 
         return access_token
 
-    def check_access_token_exists(self, token: str) -> bool:
+    async def rotate_refresh_token(self, refresh_token: str) -> tuple[str, str] | None:
+        """
+        Обменять Refresh токен на новую пару токенов (Access, Refresh).
+
+        Проверка, отзыв старого Refresh токена и сохранение обоих новых токенов выполняются
+        одной атомарной операцией, поэтому один Refresh токен нельзя использовать дважды.
+        Возвращает None, если токен невалиден, не найден, истёк или уже был использован.
+
+        Роль и поколение новых токенов читаются из хранилища, а не копируются из claims
+        старого токена: обмен редкий, а смена роли иначе никогда не дошла бы до claim role
+        у клиента, который продолжает обновлять токены. Поэтому новая роль действует не
+        позже чем через ACCESS_TOKEN_EXPIRE_MINUTES.
+        """
+        try:
+            principal = get_principal_by_token(refresh_token, "refresh_token")
+        except HTTPException:
+            return None
+
+        user = await user_repository.get_user_by_id(principal.id)
+        if user is None:
+            return None
+        # Токен из отозванного поколения ("выход со всех устройств") не обменивается.
+        # Поколение читается мимо кэша и обновляет его
+        token_generation = await jwt_tokens_repository.get_token_generation(principal.id)
+        self.token_generation_cache.set(principal.id, token_generation)
+        if principal.token_generation != token_generation:
+            return None
+
+        new_refresh_token = create_jwt_token(
+            principal.id,
+            settings.REFRESH_TOKEN_EXPIRE_MINUTES,
+            token_generation,
+            user.role,
+            "refresh_token",
+        )
+        access_token = create_jwt_token(
+            principal.id, settings.ACCESS_TOKEN_EXPIRE_MINUTES, token_generation, user.role
+        )
+
+        rotated = await jwt_tokens_repository.rotate_refresh_token(
+            principal.id,
+            refresh_token,
+            new_refresh_token,
+            # В stateless-режиме Access токен не сохраняется
+            None if settings.ACCESS_TOKEN_STATELESS else access_token,
+        )
+        if rotated is None:
+            return None
+        return access_token, new_refresh_token
+
+    async def check_access_token_exists(self, token: str) -> bool:
         """Проверка наличия Access токена в БД"""
-        return self._check_token_exists(token, "access_token")
+        return await self._check_token_exists(token, "access_token")
 
-    def check_access_token_expired(self, token: str) -> bool:
+    async def check_access_token_expired(self, token: str) -> bool:
         """Проверка того не истёк ли Access токен и не инвалидирован ли он"""
-        return self._check_token_expired(token, "access_token")
-
-    def invalidate_access_token(self, token: str) -> bool:
+        return await self.get_valid_access_token(token) is None
+
+    async def get_valid_access_token(self, token: str) -> JWTToken | None:
+        """Получение Access токена, если он не истёк и не инвалидирован"""
+        if settings.ACCESS_TOKEN_STATELESS:
+            return self._get_stateless_access_token(token)
+        return await self._get_valid_token(token, "access_token")
+
+    def _get_stateless_access_token(self, token: str) -> JWTToken | None:
+        """Проверка Access токена по подписи, exp и денайлисту (без обращений к Redis/БД)"""
+        payload = get_token_payload(token)
+        if not check_token_type(payload, "access_token"):
+            return None
+        token_hash = hash_token(token)
+        if access_token_denylist.contains(token_hash):
+            return None
+
+        expires_at = datetime.fromtimestamp(payload["exp"])
+        return JWTToken(
+            user_id=payload["user_id"],
+            token_type="access_token",
+            token_hash=token_hash,
+            expires_at=expires_at,
+            created_at=expires_at - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        )
+
+    async def invalidate_access_token(self, token: str) -> bool:
         """Инвалидация Access токена"""
-        return self._invalidate_token(token, "access_token")
+        # Сразу убираем токен из кэша, чтобы он перестал приниматься без обращения к БД
+        self.access_token_cache.pop(hash_token(token))
+        if settings.ACCESS_TOKEN_STATELESS:
+            return await self._revoke_stateless_access_token(token)
+        return await self._invalidate_token(token, "access_token")
+
+    async def _revoke_stateless_access_token(self, token: str) -> bool:
+        """Добавление Access токена в денайлист (локальный и в Redis/БД)"""
+        try:
+            payload = get_token_payload(token, verify_exp=False)
+        except HTTPException:
+            return False
+
+        expires_at = datetime.fromtimestamp(payload["exp"])
+        # Истекший токен и так не пройдет проверку exp
+        if expires_at <= datetime.now():
+            return True
+
+        access_token_denylist.add(hash_token(token), expires_at)
+        return await jwt_tokens_repository.create_revoked_access_token(
+            payload["user_id"], token, expires_at
+        )
+
+    def get_cached_access_token(self, token: str) -> CachedAccessToken | None:
+        """Получение ранее проверенного Access токена из кэша (без обращения к БД/Redis)"""
+        cached = self.access_token_cache.get(hash_token(token))
+        if cached and cached.expires_at < datetime.now():
+            self.access_token_cache.pop(hash_token(token))
+            return None
+        return cached
+
+    def cache_access_token(self, token: str, principal: Principal, expires_at: datetime) -> None:
+        """Сохранение проверенного Access токена в кэш (не дольше срока жизни токена)"""
+        ttl = (expires_at - datetime.now()).total_seconds()
+        self.access_token_cache.set(
+            hash_token(token), CachedAccessToken(principal, expires_at), ttl=ttl
+        )
 
 
 # Глобальный экземпляр сервиса
@@ -0,0 +1,61 @@
+# Фоновая очистка таблицы jwt_token_record (используется при REDIS_ENABLED=false)
+import asyncio
+import contextlib
+import logging
+
+from app.repositories.jwt_tokens_repository import jwt_tokens_repository
+
+logger = logging.getLogger(__name__)
+
+
+class JWTTokensSweeper:
+    """
+    Фоновая задача, удаляющая из БД истекшие и отозванные токены.
+
+    Без нее каждый логин и refresh добавляют строки в jwt_token_record, и таблица растет
+    бесконечно. Удаление идет пачками ограниченного размера, каждая пачка — отдельная
+    короткая транзакция, поэтому запросы не ждут долгих блокировок на запись.
+    """
+
+    def __init__(self):
+        self._sweep_task: asyncio.Task | None = None
+
+    async def sweep(self, batch_size: int) -> int:
+        """Удалить все истекшие/отозванные токены пачками по batch_size записей"""
+        deleted_total = 0
+        while True:
+            deleted = await jwt_tokens_repository.delete_expired_tokens(batch_size)
+            deleted_total += deleted
+            if deleted < batch_size:
+                break
+            # Отдаем управление event loop между пачками, чтобы не задерживать запросы
+            await asyncio.sleep(0)
+
+        if deleted_total:
+            logger.info(f"Удалено истекших/отозванных токенов: {deleted_total}")
+        return deleted_total
+
+    async def _sweep_loop(self, interval_seconds: float, batch_size: int) -> None:
+        """Периодическая очистка токенов"""
+        while True:
+            try:
+                await self.sweep(batch_size)
+            except Exception:
+                logger.exception("Не удалось очистить истекшие токены")
+            await asyncio.sleep(interval_seconds)
+
+    def start(self, interval_seconds: float, batch_size: int) -> None:
+        """Запустить фоновую очистку (вызывается из lifespan)"""
+        self._sweep_task = asyncio.create_task(self._sweep_loop(interval_seconds, batch_size))
+
+    async def stop(self) -> None:
+        """Остановить фоновую очистку"""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sweep_task
+            self._sweep_task = None
+
+
+# Глобальный экземпляр задачи очистки
+jwt_tokens_sweeper = JWTTokensSweeper()
@@ -0,0 +1,24 @@
+# Сервис для мониторинга состояния приложения
+from app.core.database import get_db_pool_stats
+from app.core.redis import get_redis_pool_stats
+from app.security.password_hasher import password_hasher
+from app.services.jwt_tokens_service import jwt_tokens_service
+from app.services.stats_cache import stats_cache
+
+
+class MonitoringService:
+    """Сервис для сбора метрик пулов соединений и кэшей"""
+
+    def get_pools_stats(self) -> dict:
+        """Получить статистику пулов соединений Redis/БД, пула bcrypt и кэшей"""
+        return {
+            "redis_pool": get_redis_pool_stats(),
+            "db_pool": get_db_pool_stats(),
+            "password_hasher": password_hasher.stats(),
+            "access_token_cache": jwt_tokens_service.access_token_cache.stats(),
+            "stats_cache": stats_cache.stats(),
+        }
+
+
+# Глобальный экземпляр сервиса
+monitoring_service = MonitoringService()
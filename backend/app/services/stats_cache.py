@@ -0,0 +1,154 @@
+# Кэш статистики тренировок: single-flight и stale-while-revalidate
+import asyncio
+import contextvars
+import json
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from datetime import date
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.workout import GymType
+from app.models.workout_stats import WorkoutStatsSummary
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Ключ кэша — параметры запроса GET /stats
+StatsCacheKey = tuple[GymType | None, date | None]
+# Запись кэша: (до какого момента значение свежее (unix time), значение)
+StatsCacheEntry = tuple[float, WorkoutStatsSummary]
+
+
+class StatsCache:
+    """
+    Кэш статистики по ключу (type, date).
+
+    - Свежее значение (моложе STATS_CACHE_TTL_SECONDS) отдается сразу.
+    - Устаревшее значение (еще STATS_CACHE_STALE_SECONDS после TTL) тоже отдается сразу,
+      а пересчет запускается в фоне — один на ключ.
+    - Одновременные промахи по одному ключу ждут одно вычисление (single-flight).
+    - При STATS_CACHE_REDIS=true (и REDIS_ENABLED=true) значения хранятся и в Redis, чтобы
+      их разделяли все воркеры uvicorn, а пересчет ключа выполнял только один воркер.
+
+    Так нагрузка статистики на БД не зависит от числа открытых дашбордов.
+    """
+
+    def __init__(self):
+        self._local = TTLCache[StatsCacheKey, StatsCacheEntry](
+            maxsize=settings.STATS_CACHE_SIZE,
+            ttl=settings.STATS_CACHE_TTL_SECONDS + settings.STATS_CACHE_STALE_SECONDS,
+        )
+        self._in_flight: dict[StatsCacheKey, asyncio.Task[WorkoutStatsSummary]] = {}
+        self.computations = 0
+        self.stale_hits = 0
+
+    def _use_redis(self) -> bool:
+        return settings.STATS_CACHE_REDIS and settings.REDIS_ENABLED
+
+    def _get_redis_key(self, key: StatsCacheKey) -> str:
+        """Получить ключ Redis для записи кэша"""
+        type, date = key
+        return f"stats:{type or '-'}:{date.isoformat() if date else '-'}"
+
+    async def get(
+        self, key: StatsCacheKey, compute: Callable[[], Awaitable[WorkoutStatsSummary]]
+    ) -> WorkoutStatsSummary:
+        """Получить статистику из кэша или вычислить её через compute()"""
+        if settings.STATS_CACHE_TTL_SECONDS <= 0:
+            return await compute()
+
+        entry = await self._get_entry(key)
+        if entry is None:
+            # shield: отмена одного запроса не отменяет вычисление для остальных ожидающих
+            return await asyncio.shield(self._start_refresh(key, compute))
+
+        fresh_until, value = entry
+        if fresh_until <= time.time():
+            self.stale_hits += 1
+            self._start_refresh(key, compute, stale=value)
+        return value
+
+    async def _get_entry(self, key: StatsCacheKey) -> StatsCacheEntry | None:
+        """Получить запись из локального кэша, а при промахе — из Redis"""
+        entry = self._local.get(key)
+        if entry is None and self._use_redis():
+            entry = await self._load_from_redis(key)
+        return entry
+
+    async def _load_from_redis(self, key: StatsCacheKey) -> StatsCacheEntry | None:
+        """Загрузить запись из Redis и сохранить её в локальный кэш"""
+        data = await get_redis().get(self._get_redis_key(key))
+        if data is None:
+            return None
+        data = json.loads(data)
+        entry = (data["fresh_until"], WorkoutStatsSummary(*data["value"]))
+        self._local.set(key, entry, ttl=entry[0] + settings.STATS_CACHE_STALE_SECONDS - time.time())
+        return entry
+
+    def _start_refresh(
+        self,
+        key: StatsCacheKey,
+        compute: Callable[[], Awaitable[WorkoutStatsSummary]],
+        stale: WorkoutStatsSummary | None = None,
+    ) -> asyncio.Task[WorkoutStatsSummary]:
+        """Запустить пересчет ключа, если он еще не выполняется"""
+        task = self._in_flight.get(key)
+        if task is None:
+            # Пустой контекст: вычисление переживает запрос, поэтому не должно
+            # присоединяться к его сессии БД (см. request_db_session)
+            task = asyncio.create_task(
+                self._refresh(key, compute, stale), context=contextvars.Context()
+            )
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._on_refresh_done(key, done))
+        return task
+
+    def _on_refresh_done(self, key: StatsCacheKey, task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Не удалось пересчитать статистику %s: %r", key, task.exception())
+
+    async def _refresh(
+        self,
+        key: StatsCacheKey,
+        compute: Callable[[], Awaitable[WorkoutStatsSummary]],
+        stale: WorkoutStatsSummary | None,
+    ) -> WorkoutStatsSummary:
+        """Вычислить значение и сохранить его в локальный кэш и Redis"""
+        ttl = settings.STATS_CACHE_TTL_SECONDS
+        if self._use_redis() and stale is not None:
+            # Устаревшее значение пересчитывает только один воркер: остальные отдают
+            # устаревшее, пока свежее не появится в Redis
+            acquired = await get_redis().set(
+                f"{self._get_redis_key(key)}:lock", 1, nx=True, ex=max(1, round(ttl))
+            )
+            if not acquired:
+                entry = await self._load_from_redis(key)
+                return entry[1] if entry else stale
+
+        self.computations += 1
+        value = await compute()
+        fresh_until = time.time() + ttl
+        self._local.set(key, (fresh_until, value))
+        if self._use_redis():
+            await get_redis().set(
+                self._get_redis_key(key),
+                json.dumps({"fresh_until": fresh_until, "value": list(value)}),
+                ex=max(1, round(ttl + settings.STATS_CACHE_STALE_SECONDS)),
+            )
+        return value
+
+    def stats(self) -> dict:
+        """Статистика кэша для мониторинга"""
+        return {
+            **self._local.stats(),
+            "stale_hits": self.stale_hits,
+            "computations": self.computations,
+            "in_flight": len(self._in_flight),
+        }
+
+
+# Глобальный экземпляр кэша статистики
+stats_cache = StatsCache()
@@ -2,27 +2,37 @@
 from datetime import date
 
 from app.models.workout import GymType
+from app.models.workout_stats import StatsTimeseriesRow, TimeseriesBucket, WorkoutStatsSummary
 from app.repositories.stats_repository import stats_repository
+from app.services.stats_cache import stats_cache
 
 
 class StatsService:
     """Сервис для бизнес-логики тренировок"""
 
-    def get_global_trains_amount(self) -> int:
-        """Получить общее количество тренировок"""
-        return stats_repository.get_global_trains_amount()
-
-    def get_global_trains_duration(self) -> int:
-        """Получить общую длительность тренировок"""
-        return stats_repository.get_global_trains_duration()
-
-    def get_global_trains_by_type(self, type: GymType) -> int:
-        """Получить количество тренировок по типу"""
-        return stats_repository.get_global_trains_by_type(type)
-
-    def get_global_trains_by_date(self, date: date) -> int:
-        """Получить количество тренировок по дате"""
-        return stats_repository.get_global_trains_by_date(date)
+    async def get_stats(
+        self, type: GymType | None = None, date: date | None = None
+    ) -> WorkoutStatsSummary:
+        """
+        Получить статистику по тренировкам (из агрегатов, без прохода по workout).
+
+        Результат кэшируется по (type, date), одновременные запросы ждут одно вычисление.
+        """
+        return await stats_cache.get((type, date), lambda: stats_repository.get_stats(type, date))
+
+    async def get_timeseries(
+        self,
+        date_from: date,
+        date_to: date,
+        bucket: TimeseriesBucket = "day",
+        type: GymType | None = None,
+    ) -> list[StatsTimeseriesRow]:
+        """Получить временной ряд статистики (количество, длительность, повторения)"""
+        return await stats_repository.get_timeseries(date_from, date_to, bucket, type)
+
+    async def rebuild_stats(self, apply: bool = True) -> dict:
+        """Пересчитать агрегаты статистики с нуля и вернуть найденные расхождения"""
+        return await stats_repository.rebuild_workout_stats(apply)
 
 
 # Глобальный экземпляр сервиса
@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import date
+
+from app.core.config import settings
+from app.models.workout import GymType, WorkoutFileFormat
+from app.repositories.workout_repository import workout_repository
+from app.services.workout_import_service import CSV_COLUMNS
+
+# Content-Type ответа для каждого формата экспорта
+EXPORT_MEDIA_TYPES: dict[WorkoutFileFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def format_ndjson_rows(rows) -> bytes:
+    """Сериализовать пачку строк workout в NDJSON"""
+    lines = []
+    for row in rows:
+        data = {column: getattr(row, column) for column in CSV_COLUMNS}
+        if data["planned_date"] is not None:
+            data["planned_date"] = data["planned_date"].isoformat()
+        lines.append(json.dumps(data, ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def format_csv_rows(rows) -> bytes:
+    """Сериализовать пачку строк workout в CSV (формат, который принимает импорт)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row in rows:
+        writer.writerow(
+            [
+                row.id,
+                row.type,
+                row.duration,
+                row.repetitions,
+                row.planned_date.isoformat() if row.planned_date else "",
+                row.notes or "",
+                # JSON-массив, а не ";": упражнение само может содержать ";"
+                json.dumps(row.exercises, ensure_ascii=False) if row.exercises else "",
+            ]
+        )
+    return buffer.getvalue().encode()
+
+
+class WorkoutExportService:
+    """Потоковый экспорт тренировок в NDJSON/CSV"""
+
+    def __init__(self, repository=workout_repository):
+        self.repository = repository
+
+    async def export_workouts(
+        self,
+        user_id: int,
+        format: WorkoutFileFormat,
+        type: GymType | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        min_duration: int | None = None,
+        max_duration: int | None = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Выгрузить тренировки пользователя с фильтрацией, отсортированные по id.
+
+        Yields:
+            Куски файла: заголовок CSV, затем по одному куску на пачку строк из БД
+        """
+        if format == "csv":
+            yield (",".join(CSV_COLUMNS) + "\n").encode()
+        serialize = format_csv_rows if format == "csv" else format_ndjson_rows
+        async for rows in self.repository.stream_all(
+            user_id=user_id,
+            type=type,
+            date_from=date_from,
+            date_to=date_to,
+            min_duration=min_duration,
+            max_duration=max_duration,
+            batch_size=settings.WORKOUT_EXPORT_BATCH_SIZE,
+        ):
+            yield serialize(rows)
+
+
+# Глобальный экземпляр сервиса экспорта
+workout_export_service = WorkoutExportService()
@@ -0,0 +1,226 @@
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.database import release_db_connection
+from app.models.workout import (
+    WorkoutFileFormat,
+    WorkoutImportError,
+    WorkoutImportResult,
+    WorkoutImportRow,
+)
+from app.repositories.workout_repository import workout_repository
+
+# Строка длиннее этого лимита отклоняется целиком и не накапливается в памяти
+MAX_LINE_BYTES = 64 * 1024
+
+# Колонки CSV (первая строка файла — заголовок); exercises — JSON-массив (так пишет экспорт)
+# или перечисление через ";". id есть в файле экспорта и при импорте игнорируется (id назначает БД)
+CSV_COLUMNS = ("id", "type", "duration", "repetitions", "planned_date", "notes", "exercises")
+CSV_REQUIRED_COLUMNS = ("type", "duration", "repetitions")
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[bytes | None]:
+    """
+    Разбить поток байтов на строки по "\\n" по мере поступления данных.
+
+    Yields:
+        Строка без перевода строки или None вместо строки длиннее max_line_bytes
+    """
+    buffer = b""
+    too_long = False
+    async for chunk in chunks:
+        lines = (buffer + chunk).split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            # Первая строка после переполнения буфера — хвост слишком длинной строки
+            yield None if too_long or len(line) > max_line_bytes else line
+            too_long = False
+        if len(buffer) > max_line_bytes:
+            too_long = True
+            buffer = b""
+    if buffer or too_long:
+        yield None if too_long else buffer
+
+
+async def iter_records(
+    lines: AsyncIterable[bytes | None],
+    quoted_newlines: bool = False,
+    max_record_bytes: int = MAX_LINE_BYTES,
+) -> AsyncIterator[tuple[int, bytes | None]]:
+    """
+    Пронумеровать строки и, для CSV (quoted_newlines), собрать из них записи: значение в
+    кавычках может содержать перевод строки, и тогда запись занимает несколько строк
+    файла. Запись не закончена, пока в ней нечетное число кавычек ("" внутри значения
+    дает две).
+
+    Yields:
+        Номер первой строки записи и запись или None вместо записи длиннее max_record_bytes
+    """
+    line_number = 0
+    start = 0
+    record = b""
+    too_long = False
+    open_quote = False
+    async for line in lines:
+        line_number += 1
+        if not open_quote:
+            start, record, too_long = line_number, b"", False
+        if line is None:
+            # Кавычки в отброшенной строке неизвестны, поэтому запись на ней заканчивается
+            open_quote = False
+            yield start, None
+            continue
+        if open_quote:
+            record += b"\n"
+        too_long = too_long or len(record) + len(line) > max_record_bytes
+        record = b"" if too_long else record + line
+        open_quote = quoted_newlines and open_quote != (line.count(b'"') % 2 == 1)
+        if not open_quote:
+            yield start, None if too_long else record
+    if open_quote:
+        # Незакрытая кавычка в конце файла: запись отклонит разбор CSV
+        yield start, None if too_long else record
+
+
+def parse_csv_header(line: str) -> list[str]:
+    """
+    Разобрать заголовок CSV.
+
+    Raises:
+        ValueError: Если в заголовке неизвестные колонки или нет обязательных
+    """
+    columns = [column.strip() for column in next(csv.reader([line]))]
+    unknown = [column for column in columns if column not in CSV_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown CSV columns: {', '.join(unknown)}")
+    missing = [column for column in CSV_REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"Missing CSV columns: {', '.join(missing)}")
+    return columns
+
+
+def parse_csv_row(line: str, columns: list[str]) -> dict:
+    """Разобрать строку CSV в словарь полей тренировки (пустые значения → None)"""
+    values = next(csv.reader([line], strict=True))
+    if len(values) != len(columns):
+        raise ValueError(f"Expected {len(columns)} columns, got {len(values)}")
+    row = {column: value.strip() or None for column, value in zip(columns, values, strict=True)}
+    if "exercises" in row:
+        row["exercises"] = parse_csv_exercises(row["exercises"] or "")
+    return row
+
+
+def parse_csv_exercises(value: str) -> list:
+    """
+    Разобрать колонку exercises: JSON-массив (в нем упражнение может содержать ";")
+    или упражнения через ";".
+    """
+    if value.startswith("["):
+        exercises = json.loads(value)
+        if not isinstance(exercises, list):
+            raise ValueError("Expected a JSON array of exercises")
+        return exercises
+    return [item.strip() for item in value.split(";") if item.strip()]
+
+
+def parse_ndjson_row(line: str) -> dict:
+    """Разобрать строку NDJSON в словарь полей тренировки"""
+    row = json.loads(line)
+    if not isinstance(row, dict):
+        raise ValueError("Expected a JSON object")
+    return row
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """Краткое описание ошибок валидации строки"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+class WorkoutImportService:
+    """Потоковый импорт тренировок из NDJSON/CSV"""
+
+    def __init__(self, repository=workout_repository):
+        self.repository = repository
+
+    async def import_workouts(
+        self,
+        user_id: int,
+        chunks: AsyncIterable[bytes],
+        format: WorkoutFileFormat,
+        batch_size: int | None = None,
+    ) -> WorkoutImportResult:
+        """
+        Импортировать тренировки пользователя из потока NDJSON или CSV.
+
+        Строки читаются и валидируются по мере поступления, валидные вставляются пачками
+        по batch_size одним INSERT (executemany) с коммитом после каждой пачки. Пока клиент
+        досылает данные, соединение с БД не удерживается, а в памяти находится не больше
+        одной пачки.
+        Пустые строки пропускаются; запись CSV может занимать несколько строк, если значение
+        в кавычках содержит перевод строки (номер ошибки — первая строка записи). Если
+        импорт прерван, ранее закоммиченные пачки остаются.
+
+        Raises:
+            ValueError: Если заголовок CSV некорректен
+        """
+        batch_size = batch_size or settings.WORKOUT_IMPORT_BATCH_SIZE
+        result = WorkoutImportResult(accepted=0, rejected=0)
+        batch: list[WorkoutImportRow] = []
+        columns: list[str] | None = None
+        records = iter_records(iter_lines(chunks), quoted_newlines=format == "csv")
+
+        async for line_number, raw_line in records:
+            try:
+                if raw_line is None:
+                    raise ValueError(f"Line is longer than {MAX_LINE_BYTES} bytes")
+                line = raw_line.decode("utf-8-sig" if line_number == 1 else "utf-8").strip()
+                if not line:
+                    continue
+                if format == "csv" and columns is None:
+                    columns = parse_csv_header(line)
+                    continue
+                row = parse_csv_row(line, columns) if format == "csv" else parse_ndjson_row(line)
+                batch.append(WorkoutImportRow.model_validate(row))
+            except ValidationError as e:
+                self._reject(result, line_number, format_validation_error(e))
+                continue
+            except (ValueError, csv.Error) as e:
+                if format == "csv" and columns is None:
+                    raise
+                self._reject(result, line_number, str(e))
+                continue
+
+            if len(batch) >= batch_size:
+                result.accepted += await self._flush(user_id, batch)
+                batch = []
+
+        result.accepted += await self._flush(user_id, batch)
+        return result
+
+    async def _flush(self, user_id: int, batch: list[WorkoutImportRow]) -> int:
+        """Вставить пачку и закоммитить ее, вернув соединение в пул до следующей пачки"""
+        if not batch:
+            return 0
+        accepted = await self.repository.create_many(user_id, batch)
+        await release_db_connection()
+        return accepted
+
+    @staticmethod
+    def _reject(result: WorkoutImportResult, line: int, error: str) -> None:
+        """Учесть отклоненную строку (описание ошибки — для первых WORKOUT_IMPORT_MAX_ERRORS)"""
+        result.rejected += 1
+        if len(result.errors) < settings.WORKOUT_IMPORT_MAX_ERRORS:
+            result.errors.append(WorkoutImportError(line=line, error=error))
+
+
+# Глобальный экземпляр сервиса импорта
+workout_import_service = WorkoutImportService()
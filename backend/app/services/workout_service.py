@@ -1,7 +1,20 @@
+import re
 from datetime import date
 
-from app.models.workout import GymType, Workout
+from app.models.workout import (
+    WORKOUT_SERVER_FIELDS,
+    GymType,
+    Workout,
+    WorkoutPatch,
+    WorkoutRow,
+)
 from app.repositories.workout_repository import workout_repository
+from app.utils.cursor import decode_cursor, encode_cursor
+
+# Слово поискового запроса: буквы и цифры (как у токенизаторов FTS5 unicode61 и tsvector)
+SEARCH_TERM_RE = re.compile(r"[^\W_]+")
+# Сколько слов запроса учитывается при поиске
+SEARCH_MAX_TERMS = 10
 
 
 class WorkoutService:
@@ -10,11 +23,11 @@ class WorkoutService:
     def __init__(self, repository=workout_repository):
         self.repository = repository
 
-    def create_workout(self, workout_data: Workout) -> Workout:
+    async def create_workout(self, workout_data: Workout) -> Workout:
         """Создать новую тренировку"""
-        return self.repository.create(workout_data)
+        return await self.repository.create(workout_data)
 
-    def get_workouts(
+    async def get_workouts(
         self,
         user_id: int,
         type: GymType | None = None,
@@ -24,9 +37,21 @@ class WorkoutService:
         max_duration: int | None = None,
         page: int = 1,
         size: int = 10,
-    ) -> list[Workout]:
-        """Получить список тренировок с фильтрацией"""
-        return self.repository.get_all(
+        cursor: str | None = None,
+    ) -> tuple[list[WorkoutRow], str | None]:
+        """
+        Получить страницу тренировок с фильтрацией.
+
+        С cursor страница продолжает предыдущую (keyset-пагинация), page игнорируется.
+
+        Returns:
+            Тренировки страницы и курсор следующей страницы (None, если она последняя)
+
+        Raises:
+            ValueError: Если курсор поврежден
+        """
+        after_id = decode_cursor(cursor, "id")[0] if cursor is not None else None
+        workouts, has_more = await self.repository.get_all(
             user_id=user_id,
             type=type,
             date_from=date_from,
@@ -35,19 +60,111 @@ class WorkoutService:
             max_duration=max_duration,
             page=page,
             size=size,
+            after_id=after_id,
         )
+        next_cursor = encode_cursor(id=workouts[-1].id) if has_more else None
+        return workouts, next_cursor
+
+    async def search_workouts(
+        self, user_id: int, q: str, size: int = 20, cursor: str | None = None
+    ) -> tuple[list[WorkoutRow], str | None]:
+        """
+        Найти тренировки пользователя по словам в заметках и упражнениях.
+
+        Запрос разбивается на слова; тренировка подходит, если в ней есть слова,
+        начинающиеся с каждого из них (префиксный поиск без учета регистра). Синтаксис
+        FTS5/tsquery из запроса не передается в БД.
+
+        Returns:
+            Тренировки страницы по убыванию релевантности и курсор следующей страницы
+
+        Raises:
+            ValueError: Если в запросе нет слов или курсор поврежден
+        """
+        terms = SEARCH_TERM_RE.findall(q.lower())[:SEARCH_MAX_TERMS]
+        if not terms:
+            raise ValueError("Search query must contain at least one word")
+        after = decode_cursor(cursor, "rank", "id", float_keys=("rank",)) if cursor else None
+        workouts, last_rank, has_more = await self.repository.search(user_id, terms, after, size)
+        next_cursor = encode_cursor(rank=last_rank, id=workouts[-1].id) if has_more else None
+        return workouts, next_cursor
+
+    async def get_workout_changes(
+        self, user_id: int, since: str | None = None, limit: int = 100
+    ) -> tuple[list[WorkoutRow], str, bool]:
+        """
+        Получить изменения тренировок пользователя после курсора синхронизации.
+
+        Курсор — позиция (change_seq, id) последнего отданного изменения. Без since
+        возвращается текущее состояние (неудаленные тренировки) и курсор для следующих
+        запросов. Если изменений нет, курсор возвращается тот же.
+
+        Returns:
+            Изменения, курсор для следующего запроса и признак того, что есть еще
 
-    def get_workout_by_id(self, workout_id: int) -> Workout | None:
+        Raises:
+            ValueError: Если курсор поврежден
+        """
+        after = decode_cursor(since, "seq", "id") if since is not None else None
+        changes, has_more = await self.repository.get_changes(user_id, after, limit)
+        if changes:
+            next_cursor = encode_cursor(seq=changes[-1].change_seq, id=changes[-1].id)
+        else:
+            next_cursor = since if since is not None else encode_cursor(seq=0, id=0)
+        return changes, next_cursor, has_more
+
+    async def get_workout_by_id(self, workout_id: int) -> Workout | None:
         """Получить тренировку по ID"""
-        return self.repository.get_by_id(workout_id)
+        return await self.repository.get_by_id(workout_id)
+
+    async def get_workouts_version(self, user_id: int) -> int:
+        """Счетчик изменений тренировок пользователя (для ETag списка)"""
+        return await self.repository.get_user_workouts_version(user_id)
+
+    async def get_workout_owner_and_version(self, workout_id: int) -> tuple[int | None, int] | None:
+        """Владелец и версия тренировки без загрузки строки целиком (None, если ее нет)"""
+        return await self.repository.get_owner_and_version(workout_id)
+
+    async def get_workout_owner_id(self, workout_id: int) -> int | None:
+        """Получить ID владельца тренировки (None, если тренировки нет)"""
+        return await self.repository.get_owner_id(workout_id)
+
+    async def update_workout(
+        self,
+        workout_id: int,
+        user_id: int,
+        workout_data: Workout,
+        expected_versions: list[int] | None = None,
+    ) -> Workout | None:
+        """
+        Обновить все поля тренировки пользователя.
+
+        Returns:
+            None, если тренировки нет, она чужая или ее версия не среди expected_versions
+        """
+        # id, владелец, версия и метки изменения не меняются из тела запроса
+        values = workout_data.model_dump(exclude=WORKOUT_SERVER_FIELDS)
+        return await self.repository.update(workout_id, user_id, values, expected_versions)
+
+    async def patch_workout(
+        self,
+        workout_id: int,
+        user_id: int,
+        patch: WorkoutPatch,
+        expected_versions: list[int] | None = None,
+    ) -> Workout | None:
+        """
+        Обновить только переданные поля тренировки пользователя.
 
-    def update_workout(self, workout_id: int, workout_data: Workout) -> Workout | None:
-        """Обновить тренировку"""
-        return self.repository.update(workout_id, workout_data)
+        Returns:
+            None, если тренировки нет, она чужая или ее версия не среди expected_versions
+        """
+        values = patch.model_dump(exclude_unset=True)
+        return await self.repository.update(workout_id, user_id, values, expected_versions)
 
-    def delete_workout(self, workout_id: int) -> bool:
-        """Удалить тренировку"""
-        return self.repository.delete(workout_id)
+    async def delete_workout(self, workout_id: int, user_id: int) -> bool:
+        """Мягко удалить тренировку пользователя (False, если тренировки нет или она чужая)"""
+        return await self.repository.delete(workout_id, user_id)
 
 
 # Глобальный экземпляр сервиса
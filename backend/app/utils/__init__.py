@@ -1,3 +1,4 @@
-from app.utils.db_decorator import with_db_session
+from app.utils.db_decorator import with_async_db_session, with_db_session
+from app.utils.ttl_cache import TTLCache
 
-__all__ = ["with_db_session"]
+__all__ = ["TTLCache", "with_async_db_session", "with_db_session"]
@@ -0,0 +1,47 @@
+import base64
+import json
+
+
+def encode_cursor(**position: int | float) -> str:
+    """
+    Закодировать позицию keyset-пагинации в непрозрачный курсор.
+
+    Args:
+        **position: Значения ключа сортировки последнего отданного элемента
+            (например, id=42, seq=7, id=42 или rank=1.5, id=42)
+
+    Returns:
+        Строка base64url без выравнивания
+    """
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(
+    cursor: str, *keys: str, float_keys: tuple[str, ...] = ()
+) -> tuple[int | float, ...]:
+    """
+    Раскодировать курсор, полученный от encode_cursor.
+
+    Args:
+        cursor: Курсор из запроса клиента
+        *keys: Ожидаемые поля позиции в нужном порядке
+        float_keys: Поля, которые могут быть дробными (остальные — только целые)
+
+    Returns:
+        Значения полей позиции в порядке keys
+
+    Raises:
+        ValueError: Если курсор поврежден или сформирован не сервером
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+        values = tuple(position[key] for key in keys)
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid cursor") from e
+    for key, value in zip(keys, values, strict=True):
+        allowed = (int, float) if key in float_keys else int
+        if not isinstance(value, allowed) or isinstance(value, bool):
+            raise ValueError("Invalid cursor")
+    return values
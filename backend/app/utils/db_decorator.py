@@ -1,7 +1,7 @@
 from collections.abc import Callable
 from functools import wraps
 
-from app.core.database import get_db_session
+from app.core.database import get_async_db_session, get_db_session
 
 
 def with_db_session(expunge_all: bool = False):
@@ -49,3 +49,39 @@ def with_db_session(expunge_all: bool = False):
         return wrapper
 
     return decorator
+
+
+def with_async_db_session(expunge_all: bool = False):
+    """
+    Асинхронный вариант with_db_session для async-методов репозиториев.
+
+    Открывает AsyncSession, передает её как первый параметр метода (после self),
+    коммитит изменения при успешном выполнении или откатывает при ошибке.
+    Пока выполняется запрос к БД, event loop обслуживает другие запросы.
+    Внутри HTTP-запроса метод присоединяется к сессии запроса (см. request_db_session),
+    и commit выполняется один раз в конце запроса.
+
+    Args:
+        expunge_all: Если True, автоматически отсоединяет все объекты от сессии перед возвратом.
+
+    Использование:
+        @with_async_db_session()
+        async def get_by_id(self, db: AsyncSession, workout_id: int) -> Workout | None:
+            return await db.get(Workout, workout_id)
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            async with get_async_db_session() as db:
+                result = await func(self, db, *args, **kwargs)
+
+                # Если нужно отсоединить все объекты от сессии
+                if expunge_all:
+                    db.expunge_all()
+
+                return result
+
+        return wrapper
+
+    return decorator
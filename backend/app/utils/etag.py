@@ -0,0 +1,34 @@
+def make_etag(version: int) -> str:
+    """Сильный ETag по версии ресурса (в кавычках, как требует RFC 9110)"""
+    return f'"{version}"'
+
+
+def parse_if_match(header: str | None) -> list[int] | None:
+    """
+    Разобрать заголовок If-Match в список ожидаемых версий.
+
+    Returns:
+        None — условия нет (заголовок не передан или равен "*"), иначе версии из
+        сильных ETag (слабые W/"..." и нераспознанные значения не совпадают ни с чем)
+    """
+    if header is None or header.strip() == "*":
+        return None
+    versions = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith('"') and tag.endswith('"') and tag[1:-1].isdigit():
+            versions.append(int(tag[1:-1]))
+    return versions
+
+
+def if_none_match_matches(header: str | None, etag: str) -> bool:
+    """
+    Совпадает ли заголовок If-None-Match с текущим ETag (слабое сравнение, RFC 9110).
+
+    Совпадение означает, что у клиента актуальная версия и можно ответить 304.
+    """
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
@@ -0,0 +1,77 @@
+import time
+from collections import OrderedDict
+
+
+class TTLCache[K, V]:
+    """
+    Ограниченный по размеру in-process кэш с вытеснением LRU и временем жизни записей.
+
+    Рассчитан на работу внутри одного event loop (без блокировок).
+    Считает попадания и промахи для мониторинга.
+
+    Использование:
+        cache = TTLCache[str, int](maxsize=1000, ttl=30)
+        cache.set("key", 42)
+        cache.get("key")  # 42, пока не истёк TTL и запись не вытеснена
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        """Получить значение по ключу или None, если записи нет или она истекла"""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        # Отмечаем запись как недавно использованную
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """
+        Сохранить значение.
+
+        Args:
+            ttl: Время жизни записи в секундах; не может превышать TTL кэша
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+
+        # Вытесняем давно не использованные записи
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> V | None:
+        """Удалить запись и вернуть её значение (если была)"""
+        item = self._data.pop(key, None)
+        return item[1] if item else None
+
+    def clear(self) -> None:
+        """Очистить кэш (счетчики сохраняются)"""
+        self._data.clear()
+
+    def stats(self) -> dict:
+        """Статистика кэша для мониторинга"""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
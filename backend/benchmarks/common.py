@@ -0,0 +1,166 @@
+"""
+Общие утилиты для бенчмарков.
+
+Бенчмарки поднимают настоящий uvicorn на временной SQLite-БД, наполняют её данными
+и нагружают API конкурентными запросами через httpx.
+
+Запуск (из директории backend/):
+    uv run --extra dev python -m benchmarks.<имя_бенчмарка> --help
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+BENCH_USERNAME = "bench"
+BENCH_PASSWORD = "bench-password"
+
+
+def setup_bench_env(tmp_dir: str | None = None) -> dict[str, str]:
+    """
+    Подготовить переменные окружения для приложения на временной БД.
+
+    Переменные выставляются и в текущем процессе (чтобы можно было импортировать
+    app.* для наполнения БД), и возвращаются для передачи в процесс uvicorn.
+    """
+    tmp_dir = tmp_dir or tempfile.mkdtemp(prefix="fitness-bench-")
+    env = {
+        "PROJECT_NAME": "Fitness API bench",
+        "VERSION": "bench",
+        "API_PREFIX": "/api",
+        "DATABASE_URL": f"sqlite:///{tmp_dir}/bench.db",
+        "SECRET_KEY": "bench-secret-key-bench-secret-key",
+        "ALGORITHM": "HS256",
+        "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+        "REFRESH_TOKEN_EXPIRE_MINUTES": "600",
+        "ADMIN_USERNAME": "admin",
+        "ADMIN_PASSWORD": "admin",
+        "LOG_LEVEL": "WARNING",
+        "REDIS_ENABLED": "false",
+    }
+    for key, value in env.items():
+        os.environ.setdefault(key, value)
+    return {**os.environ}
+
+
+def free_port() -> int:
+    """Найти свободный TCP-порт на localhost"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def run_server(env: dict[str, str], port: int | None = None) -> Iterator[str]:
+    """
+    Запустить uvicorn с приложением в отдельном процессе.
+
+    Yields:
+        Базовый URL API (например, http://127.0.0.1:8765/api)
+    """
+    port = port or free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"{base_url}/docs", timeout=1)
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise RuntimeError("uvicorn не запустился") from None
+                time.sleep(0.2)
+        yield f"{base_url}{env['API_PREFIX']}"
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def login_cookies(base_url: str, username: str, password: str) -> httpx.Cookies:
+    """Зарегистрировать пользователя (если нужно) и вернуть cookies после входа"""
+    with httpx.Client(base_url=base_url) as client:
+        client.post("/auth/register", json={"username": username, "password": password})
+        response = client.post("/auth/login", json={"username": username, "password": password})
+        response.raise_for_status()
+        return client.cookies
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Перцентиль p (0..100) по отсортированной выборке (nearest-rank)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def print_latency_report(title: str, latencies: list[float], elapsed: float) -> None:
+    """Вывести сводку по задержкам (в миллисекундах) и пропускной способности"""
+    ms = [value * 1000 for value in latencies]
+    print(f"\n{title}")
+    print(f"  запросов:   {len(ms)} за {elapsed:.2f}s ({len(ms) / elapsed:.0f} req/s)")
+    print(
+        f"  latency ms: p50={percentile(ms, 50):.1f} p95={percentile(ms, 95):.1f} "
+        f"p99={percentile(ms, 99):.1f} max={max(ms):.1f}"
+    )
+
+
+def seed_workouts(username: str, count: int, batch_size: int = 5000) -> int:
+    """
+    Наполнить БД тренировками пользователя напрямую через синхронный engine.
+
+    Returns:
+        ID пользователя, которому принадлежат тренировки
+    """
+    from datetime import date, timedelta
+
+    from sqlalchemy import insert, select
+
+    from app.core.database import engine, init_db
+    from app.models.user import User
+    from app.models.workout import Workout
+
+    init_db()
+    with engine.begin() as connection:
+        user_id = connection.execute(select(User.id).where(User.username == username)).scalar()
+        start = date(2020, 1, 1)
+        for offset in range(0, count, batch_size):
+            rows = [
+                {
+                    "user_id": user_id,
+                    "type": "gym" if i % 3 else "volleyball",
+                    "duration": 10 + i % 120,
+                    "repetitions": i % 50,
+                    "planned_date": start + timedelta(days=i % 2000),
+                    "notes": f"workout #{i}",
+                    "exercises": ["squat", "bench press"],
+                }
+                for i in range(offset, min(offset + batch_size, count))
+            ]
+            connection.execute(insert(Workout), rows)
+    return user_id
@@ -0,0 +1,89 @@
+"""
+Бенчмарк задержек под конкурентной нагрузкой.
+
+Нагружает аутентифицированные эндпоинты тренировок (список с фильтрами и получение по ID)
+из N параллельных клиентов и выводит p50/p95/p99. Позволяет сравнить поведение
+синхронного и асинхронного пути к БД: блокирующий запрос в async-роутере
+задерживает все остальные запросы воркера, что видно по хвосту распределения (p99).
+
+Запуск (из директории backend/):
+    uv run --extra dev python -m benchmarks.concurrent_latency --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from benchmarks.common import (
+    BENCH_PASSWORD,
+    BENCH_USERNAME,
+    login_cookies,
+    print_latency_report,
+    run_server,
+    seed_workouts,
+    setup_bench_env,
+)
+
+
+async def run_load(
+    base_url: str, cookies: httpx.Cookies, requests: int, concurrency: int
+) -> tuple[list[float], float]:
+    """Выполнить requests запросов из concurrency параллельных клиентов"""
+    latencies: list[float] = []
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        while not queue.empty():
+            i = queue.get_nowait()
+            if i % 4 == 0:
+                url, params = f"/workouts/{random.randint(1, 1000)}", None
+            else:
+                params = {"min_duration": random.randint(10, 100), "size": 50}
+                url = "/workouts"
+            started = time.perf_counter()
+            response = await client.get(url, params=params)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, cookies=cookies, limits=limits, timeout=60
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workouts", type=int, default=20000)
+    args = parser.parse_args()
+
+    env = setup_bench_env()
+    with run_server(env) as base_url:
+        cookies = login_cookies(base_url, BENCH_USERNAME, BENCH_PASSWORD)
+        seed_workouts(BENCH_USERNAME, args.workouts)
+
+        # Прогрев: соединения, кэши SQLite
+        asyncio.run(run_load(base_url, cookies, args.concurrency, args.concurrency))
+        latencies, elapsed = asyncio.run(
+            run_load(base_url, cookies, args.requests, args.concurrency)
+        )
+
+    print_latency_report(
+        f"GET /workouts под нагрузкой (concurrency={args.concurrency}, workouts={args.workouts})",
+        latencies,
+        elapsed,
+    )
+
+
+if __name__ == "__main__":
+    main()
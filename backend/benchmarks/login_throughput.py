@@ -0,0 +1,90 @@
+"""
+Бенчмарк пропускной способности логина при разном числе воркеров bcrypt.
+
+Для каждого значения PASSWORD_HASH_WORKERS поднимает uvicorn и выполняет логины из
+N параллельных клиентов. Выводит req/s, задержки и число быстрых отказов 503
+(переполнение очереди хеширования, PASSWORD_HASH_MAX_QUEUE).
+
+Запуск (из директории backend/):
+    uv run --extra dev python -m benchmarks.login_throughput --workers 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.common import (
+    BENCH_PASSWORD,
+    BENCH_USERNAME,
+    login_cookies,
+    print_latency_report,
+    run_server,
+    setup_bench_env,
+)
+
+
+async def run_logins(
+    base_url: str, requests: int, concurrency: int
+) -> tuple[list[float], float, int]:
+    """Выполнить requests логинов из concurrency параллельных клиентов"""
+    latencies: list[float] = []
+    rejected = 0
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal rejected
+        credentials = {"username": BENCH_USERNAME, "password": BENCH_PASSWORD}
+        while not queue.empty():
+            queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.post("/auth/login", json=credentials)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code == 503:
+                rejected += 1
+            else:
+                response.raise_for_status()
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, elapsed, rejected
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    env = setup_bench_env()
+    for workers in args.workers:
+        server_env = {
+            **env,
+            "PASSWORD_HASH_EXECUTOR": args.executor,
+            "PASSWORD_HASH_WORKERS": str(workers),
+        }
+        with run_server(server_env) as base_url:
+            login_cookies(base_url, BENCH_USERNAME, BENCH_PASSWORD)
+            latencies, elapsed, rejected = asyncio.run(
+                run_logins(base_url, args.requests, args.concurrency)
+            )
+
+        print_latency_report(
+            f"POST /auth/login ({args.executor}, workers={workers}, "
+            f"concurrency={args.concurrency})",
+            latencies,
+            elapsed,
+        )
+        print(f"  отказов 503: {rejected}")
+
+
+if __name__ == "__main__":
+    main()
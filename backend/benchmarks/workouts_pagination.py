@@ -0,0 +1,71 @@
+"""
+Бенчмарк глубокой пагинации GET /workouts: offset (page/size) против курсора.
+
+Наполняет БД тренировками одного пользователя и для каждой глубины запрашивает страницу
+двумя способами: ?page=N (OFFSET в SQL) и ?cursor=... (keyset по id). Для offset время
+растет вместе с глубиной, для курсора должно оставаться постоянным.
+
+Запуск (из директории backend/):
+    uv run --extra dev python -m benchmarks.workouts_pagination --workouts 1000000
+"""
+
+import argparse
+import time
+
+import httpx
+
+from benchmarks.common import (
+    BENCH_PASSWORD,
+    BENCH_USERNAME,
+    login_cookies,
+    percentile,
+    run_server,
+    seed_workouts,
+    setup_bench_env,
+)
+
+
+def measure(client: httpx.Client, params: dict, repeat: int) -> float:
+    """Медиана времени ответа (мс) на repeat одинаковых запросов"""
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get("/workouts", params=params)
+        latencies.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return percentile(latencies, 50)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workouts", type=int, default=1_000_000)
+    parser.add_argument("--size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    env = setup_bench_env()
+    with run_server(env) as base_url:
+        cookies = login_cookies(base_url, BENCH_USERNAME, BENCH_PASSWORD)
+        started = time.perf_counter()
+        seed_workouts(BENCH_USERNAME, args.workouts)
+        print(f"Наполнение: {args.workouts} тренировок за {time.perf_counter() - started:.1f}s")
+
+        from app.utils.cursor import encode_cursor
+
+        depths = [0, 1_000, 10_000, 100_000, args.workouts // 2, args.workouts - args.size]
+        print(f"\n{'глубина':>10} {'offset, мс':>12} {'cursor, мс':>12}")
+        with httpx.Client(base_url=base_url, cookies=cookies, timeout=120) as client:
+            # Прогрев: соединения, кэш страниц SQLite
+            measure(client, {"size": args.size}, args.repeat)
+            for depth in sorted({d for d in depths if 0 <= d < args.workouts}):
+                page = depth // args.size + 1
+                offset_ms = measure(client, {"page": page, "size": args.size}, args.repeat)
+                # ID тренировок у единственного пользователя идут подряд с 1
+                cursor = encode_cursor(id=(page - 1) * args.size)
+                cursor_params = {"cursor": cursor, "size": args.size}
+                cursor_ms = measure(client, cursor_params, args.repeat)
+                print(f"{depth:>10} {offset_ms:>12.2f} {cursor_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Бенчмарк чтения списка тренировок: ORM-объекты Workout против Core-строк WorkoutRow.
+
+Наполняет временную SQLite-БД и загружает страницу GET /workouts (по умолчанию 10 000
+тренировок) двумя способами, каждый раз вместе с сериализацией ответа (ORJSONResponse):
+
+- ORM: select(Workout) → объекты с инструментированием атрибутов в identity map,
+  затем expunge_all (как WorkoutRepository.get_all раньше);
+- Core: WorkoutRepository.get_all → select() колонок в dataclass WorkoutRow.
+
+Для каждого способа печатаются медианное время запроса, пропускная способность
+(тренировок в секунду) и пик выделенной памяти (tracemalloc, отдельным прогоном).
+
+Запуск (из директории backend/):
+    uv run --extra dev python -m benchmarks.workouts_read_path --rows 10000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from benchmarks.common import BENCH_USERNAME, percentile, seed_workouts, setup_bench_env
+
+
+async def measure(load, repeat: int) -> tuple[float, float]:
+    """
+    Медиана времени (мс) загрузки и сериализации страницы и пик памяти (МБ).
+
+    Память измеряется отдельным прогоном: tracemalloc заметно замедляет выполнение.
+    """
+    await load()  # Прогрев: соединение, кэш скомпилированных запросов
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await load()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    await load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return percentile(timings, 50), peak / 1024 / 1024
+
+
+async def run(rows: int, repeat: int) -> None:
+    from sqlalchemy import insert, select
+
+    from app.api.responses import ORJSONResponse
+    from app.core.database import AsyncSessionLocal, close_async_engine, engine, init_db
+    from app.models.user import User
+    from app.models.workout import Workout
+    from app.repositories.workout_repository import workout_repository
+
+    init_db()
+    with engine.begin() as connection:
+        connection.execute(insert(User).values(username=BENCH_USERNAME, password="-", role="user"))
+    user_id = seed_workouts(BENCH_USERNAME, rows)
+
+    async def load_orm() -> bytes:
+        async with AsyncSessionLocal() as db:
+            query = workout_repository._filter_workouts(select(Workout), user_id=user_id, size=rows)
+            workouts = list((await db.execute(query)).scalars().all())[:rows]
+            db.expunge_all()
+        return ORJSONResponse(workouts).body
+
+    async def load_core() -> bytes:
+        workouts, _ = await workout_repository.get_all(user_id=user_id, size=rows)
+        return ORJSONResponse(workouts).body
+
+    # Оба способа должны давать один и тот же JSON (с точностью до порядка ключей)
+    assert json.loads(await load_orm()) == json.loads(await load_core())
+    print(f"Тренировок на запрос: {rows}")
+    print(f"{'способ':>6} {'мс/запрос':>10} {'тренировок/с':>14} {'пик памяти, МБ':>16}")
+    for name, load in (("ORM", load_orm), ("Core", load_core)):
+        median_ms, peak_mb = await measure(load, repeat)
+        print(f"{name:>6} {median_ms:>10.1f} {rows / median_ms * 1000:>14.0f} {peak_mb:>16.1f}")
+
+    await close_async_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_bench_env()
+    asyncio.run(run(args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
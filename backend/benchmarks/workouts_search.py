@@ -0,0 +1,113 @@
+"""
+Бенчмарк полнотекстового поиска GET /workouts/search на миллионах тренировок.
+
+Наполняет БД тренировками многих пользователей с заметками из случайных слов (индекс
+поиска заполняется триггерами, как при обычной записи) и измеряет задержку поиска
+одного пользователя для редкого слова, частого префикса и запроса из двух слов.
+
+Запуск (из директории backend/):
+    uv run --extra dev python -m benchmarks.workouts_search --workouts 1000000 --users 100
+"""
+
+import argparse
+import random
+import time
+
+import httpx
+
+from benchmarks.common import (
+    BENCH_PASSWORD,
+    BENCH_USERNAME,
+    login_cookies,
+    percentile,
+    run_server,
+    setup_bench_env,
+)
+
+# Частые слова заметок и упражнений; к ним добавляются синтетические редкие слова
+COMMON_WORDS = ["squat", "bench", "press", "row", "run", "easy", "heavy", "tempo", "sprint"]
+RARE_WORDS = ["deadlift", "snatch", "clean", "jerk", "burpee", "plank", "lunge", "dip"]
+QUERIES = {
+    "редкое слово": "deadlift",
+    "частый префикс": "sq",
+    "два слова": "heavy deadlift",
+}
+
+
+def seed_search_workouts(username: str, count: int, users: int, batch_size: int = 5000) -> None:
+    """Наполнить БД тренировками users пользователей (один из них — username)"""
+    from sqlalchemy import insert, select
+
+    from app.core.database import engine, init_db
+    from app.models.user import User
+    from app.models.workout import Workout
+
+    init_db()
+    rng = random.Random(42)
+    vocabulary = COMMON_WORDS * 20 + RARE_WORDS + [f"word{i}" for i in range(5000)]
+    with engine.begin() as connection:
+        bench_user_id = connection.execute(
+            select(User.id).where(User.username == username)
+        ).scalar()
+        connection.execute(
+            insert(User),
+            [
+                {"username": f"search-{i}", "password": "-", "role": "user"}
+                for i in range(users - 1)
+            ],
+        )
+        user_ids = [bench_user_id] + list(
+            connection.execute(select(User.id).where(User.username.like("search-%"))).scalars()
+        )
+        for offset in range(0, count, batch_size):
+            rows = [
+                {
+                    "user_id": user_ids[i % len(user_ids)],
+                    "type": "gym",
+                    "duration": 30,
+                    "repetitions": 10,
+                    "notes": " ".join(rng.choices(vocabulary, k=6)),
+                    "exercises": rng.choices(COMMON_WORDS + RARE_WORDS, k=2),
+                }
+                for i in range(offset, min(offset + batch_size, count))
+            ]
+            connection.execute(insert(Workout), rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workouts", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    env = setup_bench_env()
+    with run_server(env) as base_url:
+        cookies = login_cookies(base_url, BENCH_USERNAME, BENCH_PASSWORD)
+        started = time.perf_counter()
+        seed_search_workouts(BENCH_USERNAME, args.workouts, args.users)
+        print(
+            f"Наполнение: {args.workouts} тренировок {args.users} пользователей "
+            f"за {time.perf_counter() - started:.1f}s"
+        )
+
+        print(f"\n{'запрос':>16} {'найдено':>8} {'p50, мс':>9} {'p95, мс':>9}")
+        with httpx.Client(base_url=base_url, cookies=cookies, timeout=60) as client:
+            for title, q in QUERIES.items():
+                params = {"q": q, "size": args.size}
+                response = client.get("/workouts/search", params=params)
+                response.raise_for_status()
+                latencies = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    client.get("/workouts/search", params=params).raise_for_status()
+                    latencies.append((time.perf_counter() - started) * 1000)
+                print(
+                    f"{title:>16} {len(response.json()):>8} "
+                    f"{percentile(latencies, 50):>9.2f} {percentile(latencies, 95):>9.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
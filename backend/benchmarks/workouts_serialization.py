@@ -0,0 +1,88 @@
+"""
+Бенчмарк сериализации списка тренировок: стоимость на 1000 тренировок до и после ORJSONResponse.
+
+Загружает страницу тренировок из временной SQLite-БД и сравнивает, сколько CPU уходит на
+превращение ее в тело ответа:
+
+- «до»: ORM-объекты Workout и путь FastAPI по умолчанию — проверка по
+  response_model=list[Workout], сериализация в словари и json.dumps (JSONResponse);
+- «после»: строки WorkoutRow из WorkoutRepository.get_all (как GET /workouts) в
+  ORJSONResponse, без повторной проверки.
+
+Сервер не поднимается: измеряется только сериализация, без сети и запросов к БД.
+
+Запуск (из директории backend/):
+    uv run --extra dev python -m benchmarks.workouts_serialization --workouts 1000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import BENCH_USERNAME, percentile, seed_workouts, setup_bench_env
+
+
+def measure(render, repeat: int) -> float:
+    """Медиана времени (мс) одного вызова render"""
+    render()  # Прогрев
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render()
+        timings.append((time.perf_counter() - started) * 1000)
+    return percentile(timings, 50)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workouts", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_bench_env()
+
+    from fastapi.responses import JSONResponse
+    from fastapi.utils import create_model_field
+    from sqlalchemy import insert, select
+    from sqlmodel import Session
+
+    from app.api.responses import ORJSONResponse
+    from app.core.database import engine, init_db
+    from app.models.user import User
+    from app.models.workout import Workout
+    from app.repositories.workout_repository import workout_repository
+
+    init_db()
+    with engine.begin() as connection:
+        connection.execute(insert(User).values(username=BENCH_USERNAME, password="-", role="user"))
+    user_id = seed_workouts(BENCH_USERNAME, args.workouts)
+    with Session(engine, expire_on_commit=False) as db:
+        orm_workouts = list(db.scalars(select(Workout).order_by(Workout.id)))
+        db.expunge_all()
+    workouts, _ = asyncio.run(workout_repository.get_all(user_id=user_id, size=args.workouts))
+
+    response_field = create_model_field(name="Response", type_=list[Workout], mode="serialization")
+
+    def render_default() -> bytes:
+        # То же, что делает fastapi.routing.serialize_response для response_model
+        value, errors = response_field.validate(orm_workouts, {}, loc=("response",))
+        assert not errors
+        return JSONResponse(response_field.serialize(value)).body
+
+    def render_orjson() -> bytes:
+        return ORJSONResponse(workouts).body
+
+    # Оба пути должны давать один и тот же JSON (с точностью до порядка ключей)
+    assert json.loads(render_default()) == json.loads(render_orjson())
+    before = measure(render_default, args.repeat)
+    after = measure(render_orjson, args.repeat)
+    per_1k = 1000 / len(workouts)
+    print(f"Тренировок на странице: {len(workouts)}")
+    print(f"  до (response_model + json.dumps): {before * per_1k:.2f} мс на 1000 тренировок")
+    print(f"  после (ORJSONResponse напрямую):  {after * per_1k:.2f} мс на 1000 тренировок")
+    print(f"  ускорение: x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Бенчмарк пропускной способности записи тренировок: PUT и DELETE /workouts/{id}.
+
+Наполняет БД тренировками одного пользователя, затем из N параллельных клиентов
+обновляет случайные тренировки первой половины и удаляет тренировки второй половины
+(каждую один раз). Выводит req/s, задержки и число ошибок (5xx, оборванные соединения) отдельно для PUT и DELETE
+(на SQLite конкурентные транзакции чтение→запись могут завершаться "database is locked").
+
+Запуск (из директории backend/):
+    uv run --extra dev python -m benchmarks.workouts_write_throughput --requests 2000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from benchmarks.common import (
+    BENCH_PASSWORD,
+    BENCH_USERNAME,
+    login_cookies,
+    print_latency_report,
+    run_server,
+    seed_workouts,
+    setup_bench_env,
+)
+
+
+async def run_writes(
+    base_url: str,
+    cookies: httpx.Cookies,
+    user_id: int,
+    method: str,
+    ids: list[int],
+    concurrency: int,
+) -> tuple[list[float], float, int]:
+    """Выполнить по запросу method на каждый ID из concurrency параллельных клиентов"""
+    latencies: list[float] = []
+    failed = 0
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for workout_id in ids:
+        queue.put_nowait(workout_id)
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal failed
+        while not queue.empty():
+            workout_id = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                if method == "PUT":
+                    body = {
+                        "id": workout_id,
+                        "user_id": user_id,
+                        "type": random.choice(["gym", "volleyball"]),
+                        "duration": random.randint(10, 120),
+                        "repetitions": random.randint(0, 50),
+                        "planned_date": f"2025-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+                        "notes": "updated",
+                        "exercises": ["squat"],
+                    }
+                    response = await client.put(f"/workouts/{workout_id}", json=body)
+                else:
+                    response = await client.delete(f"/workouts/{workout_id}")
+            except httpx.TransportError:
+                # Необработанная ошибка на сервере обрывает соединение
+                response = None
+            latencies.append(time.perf_counter() - started)
+            if response is None or response.status_code >= 500:
+                failed += 1
+            else:
+                response.raise_for_status()
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, cookies=cookies, limits=limits, timeout=60
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, elapsed, failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    env = setup_bench_env()
+    with run_server(env) as base_url:
+        cookies = login_cookies(base_url, BENCH_USERNAME, BENCH_PASSWORD)
+        # ID тренировок единственного пользователя идут подряд с 1
+        user_id = seed_workouts(BENCH_USERNAME, args.requests * 2)
+        update_ids = [random.randint(1, args.requests) for _ in range(args.requests)]
+        delete_ids = list(range(args.requests + 1, args.requests * 2 + 1))
+        random.shuffle(delete_ids)
+
+        for method, ids in (("PUT", update_ids), ("DELETE", delete_ids)):
+            latencies, elapsed, failed = asyncio.run(
+                run_writes(base_url, cookies, user_id, method, ids, args.concurrency)
+            )
+            print_latency_report(
+                f"{method} /workouts/{{id}} (concurrency={args.concurrency})", latencies, elapsed
+            )
+            print(f"  ошибок: {failed}")
+
+
+if __name__ == "__main__":
+    main()
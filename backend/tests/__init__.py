@@ -0,0 +1,29 @@
+"""
+Тесты приложения.
+
+Настройки читаются из переменных окружения при импорте app.core.config, поэтому
+окружение задается здесь, до импорта app.* в модулях тестов: временная SQLite-БД и
+хранение токенов в БД (без Redis).
+"""
+
+import os
+import tempfile
+
+TEST_DB_DIR = tempfile.mkdtemp(prefix="fitness-tests-")
+
+os.environ.update(
+    {
+        "PROJECT_NAME": "Fitness API tests",
+        "VERSION": "tests",
+        "API_PREFIX": "/api",
+        "DATABASE_URL": f"sqlite:///{TEST_DB_DIR}/tests.db",
+        "SECRET_KEY": "tests-secret-key-tests-secret-key",
+        "ALGORITHM": "HS256",
+        "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+        "REFRESH_TOKEN_EXPIRE_MINUTES": "600",
+        "ADMIN_USERNAME": "admin",
+        "ADMIN_PASSWORD": "admin",
+        "LOG_LEVEL": "WARNING",
+        "REDIS_ENABLED": "false",
+    }
+)
@@ -0,0 +1,101 @@
+"""
+Выгрузка тренировок в CSV и обратная загрузка через импорт дают те же тренировки.
+
+Запуск (из директории backend/):
+    uv run python -m unittest discover -s tests -t .
+"""
+
+import unittest
+from datetime import date
+from types import SimpleNamespace
+
+from app.services.workout_export_service import format_csv_rows
+from app.services.workout_import_service import CSV_COLUMNS, WorkoutImportService
+
+
+class CollectingRepository:
+    """Репозиторий, который запоминает вставленные пачки вместо записи в БД"""
+
+    def __init__(self):
+        self.rows = []
+        self.user_ids = set()
+
+    async def create_many(self, user_id: int, batch: list) -> int:
+        self.rows.extend(batch)
+        self.user_ids.add(user_id)
+        return len(batch)
+
+
+async def split_chunks(body: bytes, size: int):
+    """Отдать тело запроса кусками по size байт, как при потоковой загрузке"""
+    for offset in range(0, len(body), size):
+        yield body[offset : offset + size]
+
+
+class WorkoutCsvRoundTripTest(unittest.IsolatedAsyncioTestCase):
+    workouts = [
+        SimpleNamespace(
+            id=1,
+            type="gym",
+            duration=60,
+            repetitions=12,
+            planned_date=date(2026, 10, 1),
+            notes='line1\nline2, "q"\r\nline3',
+            exercises=["a;b", "c", 'жим "лежа", 3x10'],
+        ),
+        SimpleNamespace(
+            id=2,
+            type="volleyball",
+            duration=90,
+            repetitions=0,
+            planned_date=None,
+            notes=None,
+            exercises=[],
+        ),
+        SimpleNamespace(
+            id=3,
+            type="gym",
+            duration=30,
+            repetitions=5,
+            planned_date=None,
+            notes='"',
+            exercises=["["],
+        ),
+    ]
+
+    async def import_csv(self, body: bytes, chunk_size: int):
+        repository = CollectingRepository()
+        result = await WorkoutImportService(repository).import_workouts(
+            user_id=1, chunks=split_chunks(body, chunk_size), format="csv"
+        )
+        return result, repository.rows
+
+    async def test_export_imports_back(self):
+        body = (",".join(CSV_COLUMNS) + "\n").encode() + format_csv_rows(self.workouts)
+        for chunk_size in (1, 7, len(body)):
+            with self.subTest(chunk_size=chunk_size):
+                result, rows = await self.import_csv(body, chunk_size)
+                self.assertEqual((result.accepted, result.rejected), (3, 0), result.errors)
+                for row, workout in zip(rows, self.workouts, strict=True):
+                    self.assertEqual(row.type, workout.type)
+                    self.assertEqual(row.duration, workout.duration)
+                    self.assertEqual(row.repetitions, workout.repetitions)
+                    self.assertEqual(row.planned_date, workout.planned_date)
+                    self.assertEqual(row.notes, workout.notes)
+                    self.assertEqual(row.exercises, workout.exercises)
+
+    async def test_semicolon_exercises_and_error_lines(self):
+        body = (
+            b"type,duration,repetitions,notes,exercises\n"
+            b'gym,10,1,"two\nlines",squat; bench\n'
+            b"gym,-1,1,,\n"
+            b'gym,10,1,"unterminated\n'
+        )
+        result, rows = await self.import_csv(body, 5)
+        self.assertEqual((result.accepted, result.rejected), (1, 2))
+        self.assertEqual(rows[0].exercises, ["squat", "bench"])
+        self.assertEqual([error.line for error in result.errors], [4, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Каждый вариант фильтрации списка тренировок выполняется по индексу (user_id, ...).
+
+Для всех комбинаций фильтров WorkoutRepository._filter_workouts (тип, диапазон дат,
+длительность) в режимах page и cursor строится запрос и проверяется его EXPLAIN QUERY
+PLAN на временной SQLite-БД, к которой применены все миграции.
+
+Запуск (из директории backend/):
+    uv run python -m unittest discover -s tests -t .
+"""
+
+import itertools
+import unittest
+from datetime import date
+
+from sqlalchemy import select, text
+
+from app.core.database import engine, init_db
+from app.models.workout import Workout
+from app.repositories.workout_repository import workout_repository
+
+# Значения фильтров: важен только факт наличия фильтра, а не конкретное значение
+FILTER_VALUES = {
+    "type": "gym",
+    "date_from": date(2025, 1, 1),
+    "date_to": date(2025, 12, 31),
+    "min_duration": 10,
+    "max_duration": 60,
+}
+
+
+def iter_filter_combinations():
+    """Все комбинации фильтров _filter_workouts в режимах page и cursor"""
+    names = list(FILTER_VALUES)
+    for count in range(len(names) + 1):
+        for combination in itertools.combinations(names, count):
+            filters = {name: FILTER_VALUES[name] for name in combination}
+            yield {**filters, "page": 3}
+            yield {**filters, "after_id": 100}
+
+
+class WorkoutIndexesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+
+    @classmethod
+    def tearDownClass(cls):
+        engine.dispose()
+
+    def explain(self, **filters) -> list[str]:
+        """Строки плана (detail) запроса списка тренировок с заданными фильтрами"""
+        query = workout_repository._filter_workouts(select(Workout), user_id=1, size=10, **filters)
+        compiled = query.compile(engine, compile_kwargs={"literal_binds": True})
+        with engine.connect() as connection:
+            rows = connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+        return [row.detail for row in rows]
+
+    def workout_index(self, plan: list[str]) -> str:
+        """Индекс, по которому читается таблица workout (полный просмотр — ошибка)"""
+        for line in plan:
+            if line.startswith("SCAN workout"):
+                self.fail(f"Full scan of workout: {plan}")
+            if line.startswith("SEARCH workout USING "):
+                return line.split()[4]
+        self.fail(f"No workout access in plan: {plan}")
+
+    def test_every_filter_combination_uses_user_index(self):
+        for filters in iter_filter_combinations():
+            with self.subTest(filters=", ".join(filters)):
+                index = self.workout_index(self.explain(**filters))
+                self.assertTrue(index.startswith("ix_workout_user_id_"), index)
+
+    def test_filters_use_matching_index(self):
+        cases = [
+            ({"after_id": 100}, "ix_workout_user_id_id"),
+            ({"page": 3}, "ix_workout_user_id_id"),
+            ({"date_from": date(2025, 1, 1)}, "ix_workout_user_id_planned_date_id"),
+            (
+                {"type": "gym", "date_from": date(2025, 1, 1)},
+                "ix_workout_user_id_type_planned_date",
+            ),
+            ({"min_duration": 10, "max_duration": 60}, "ix_workout_user_id_duration"),
+        ]
+        for filters, expected in cases:
+            with self.subTest(filters=", ".join(filters)):
+                self.assertEqual(self.workout_index(self.explain(**filters)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()